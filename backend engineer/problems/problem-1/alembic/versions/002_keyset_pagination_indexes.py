@@ -0,0 +1,36 @@
+"""Keyset pagination indexes
+
+Revision ID: 002
+Revises: 001
+Create Date: 2024-01-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_projects_owner_id_created_at_id',
+        'projects',
+        ['owner_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+    op.create_index(
+        'ix_tasks_project_id_created_at_id',
+        'tasks',
+        ['project_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_project_id_created_at_id', table_name='tasks')
+    op.drop_index('ix_projects_owner_id_created_at_id', table_name='projects')
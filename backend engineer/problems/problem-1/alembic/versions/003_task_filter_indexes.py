@@ -0,0 +1,30 @@
+"""Task filter indexes
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-01-20 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_tasks_project_id_status', 'tasks', ['project_id', 'status'], unique=False)
+    # Not used for filtering; the primary key already indexes id
+    op.drop_index(op.f('ix_tasks_title'), table_name='tasks')
+    op.drop_index(op.f('ix_tasks_id'), table_name='tasks')
+    op.drop_index(op.f('ix_projects_id'), table_name='projects')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_projects_id'), 'projects', ['id'], unique=False)
+    op.create_index(op.f('ix_tasks_id'), 'tasks', ['id'], unique=False)
+    op.create_index(op.f('ix_tasks_title'), 'tasks', ['title'], unique=False)
+    op.drop_index('ix_tasks_project_id_status', table_name='tasks')
@@ -5,7 +5,7 @@ Authentication endpoints for user registration and login.
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from datetime import timedelta
 
 from app.core.database import get_db
@@ -49,16 +49,18 @@ async def register_user(
             )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
-    db_user = User(
-        email=user_data.email,
-        username=user_data.username,
-        hashed_password=hashed_password
+    hashed_password = await get_password_hash(user_data.password)
+    result = await db.execute(
+        insert(User)
+        .values(
+            email=user_data.email,
+            username=user_data.username,
+            hashed_password=hashed_password
+        )
+        .returning(User)
     )
-    
-    db.add(db_user)
+    db_user = result.scalar_one()
     await db.commit()
-    await db.refresh(db_user)
     
     return db_user
 
@@ -75,7 +77,7 @@ async def login_user(
     )
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    if not user or not await verify_password(user_credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -108,7 +110,7 @@ async def login_for_access_token(
     )
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -131,7 +133,7 @@ async def login_for_access_token(
 
 @router.get("/me", response_model=UserSchema)
 async def read_users_me(
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserSchema = Depends(get_current_active_user)
 ):
     """Get current user information."""
     return current_user
@@ -2,74 +2,117 @@
 Project management endpoints.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy.orm import with_expression
+from sqlalchemy import select, func, insert, update, delete, bindparam, lambda_stmt
 from typing import List, Optional
 
+from app.core.caching import build_etag, etag_matches, not_modified
 from app.core.database import get_db
+from app.core.pagination import encode_cursor, seek_after
 from app.core.security import get_current_active_user
-from app.models.user import User
 from app.models.project import Project
+from app.models.task import Task
 from app.schemas.project import (
     Project as ProjectSchema,
     ProjectCreate,
     ProjectUpdate,
     ProjectSummary
 )
+from app.schemas.user import User as UserSchema
 
 router = APIRouter()
 
+# Fixed-shape statements are built once at import time; SQLAlchemy caches
+# their compiled SQL so each request only binds parameters
+_get_project_stmt = lambda_stmt(
+    lambda: select(Project).where(
+        Project.id == bindparam("project_id"),
+        Project.owner_id == bindparam("owner_id")
+    )
+)
+_delete_project_stmt = lambda_stmt(
+    lambda: delete(Project).where(
+        Project.id == bindparam("project_id"),
+        Project.owner_id == bindparam("owner_id")
+    )
+)
+
 
 @router.get("/", response_model=List[ProjectSummary])
 async def get_projects(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(get_current_active_user),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    current_user: UserSchema = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get user's projects with pagination."""
-    result = await db.execute(
+    # Fingerprint the user's projects and their tasks so that an unchanged
+    # listing can be answered with 304 before fetching the page
+    fingerprint = await db.execute(
+        select(
+            func.max(Project.updated_at),
+            func.count(func.distinct(Project.id)),
+            func.max(Task.updated_at),
+            func.count(Task.id)
+        )
+        .select_from(Project)
+        .outerjoin(Task, Task.project_id == Project.id)
+        .where(Project.owner_id == current_user.id)
+    )
+    etag = build_etag(current_user.id, *fingerprint.one(), skip, limit, after)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    
+    query = (
         select(Project)
+        .options(with_expression(Project.task_count, func.count(Task.id)))
+        .outerjoin(Task, Task.project_id == Project.id)
         .where(Project.owner_id == current_user.id)
+    )
+    if after:
+        query = query.where(seek_after(Project, after))
+    
+    result = await db.execute(
+        query
+        .group_by(Project.id)
+        .order_by(Project.created_at.desc(), Project.id.desc())
         .offset(skip)
         .limit(limit)
-        .order_by(Project.created_at.desc())
+        .execution_options(populate_existing=True)
     )
+    # Task counts come back alongside each project in a single round-trip
     projects = result.scalars().all()
     
-    # Add task count to each project
-    project_summaries = []
-    for project in projects:
-        task_count_result = await db.execute(
-            select(func.count(Project.tasks))
-            .where(Project.id == project.id)
-        )
-        task_count = task_count_result.scalar() or 0
-        
-        project_dict = project.__dict__.copy()
-        project_dict['task_count'] = task_count
-        project_summaries.append(ProjectSummary(**project_dict))
+    if len(projects) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(projects[-1].created_at, projects[-1].id)
     
-    return project_summaries
+    return projects
 
 
 @router.post("/", response_model=ProjectSchema, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project_data: ProjectCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserSchema = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new project."""
-    db_project = Project(
-        name=project_data.name,
-        description=project_data.description,
-        owner_id=current_user.id
+    result = await db.execute(
+        insert(Project)
+        .values(
+            name=project_data.name,
+            description=project_data.description,
+            owner_id=current_user.id
+        )
+        .returning(Project)
     )
-    
-    db.add(db_project)
+    db_project = result.scalar_one()
     await db.commit()
-    await db.refresh(db_project)
     
     return db_project
 
@@ -77,15 +120,12 @@ async def create_project(
 @router.get("/{project_id}", response_model=ProjectSchema)
 async def get_project(
     project_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserSchema = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific project by ID."""
     result = await db.execute(
-        select(Project).where(
-            Project.id == project_id,
-            Project.owner_id == current_user.id
-        )
+        _get_project_stmt, {"project_id": project_id, "owner_id": current_user.id}
     )
     project = result.scalar_one_or_none()
     
@@ -102,15 +142,20 @@ async def get_project(
 async def update_project(
     project_id: int,
     project_update: ProjectUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserSchema = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Update a project."""
+    update_data = project_update.model_dump(exclude_unset=True)
     result = await db.execute(
-        select(Project).where(
+        update(Project)
+        .where(
             Project.id == project_id,
             Project.owner_id == current_user.id
         )
+        .values(update_data)
+        .returning(Project)
+        .execution_options(populate_existing=True)
     )
     project = result.scalar_one_or_none()
     
@@ -120,13 +165,7 @@ async def update_project(
             detail="Project not found"
         )
     
-    # Update project fields
-    update_data = project_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(project, field, value)
-    
     await db.commit()
-    await db.refresh(project)
     
     return project
 
@@ -134,25 +173,20 @@ async def update_project(
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_project(
     project_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserSchema = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a project."""
     result = await db.execute(
-        select(Project).where(
-            Project.id == project_id,
-            Project.owner_id == current_user.id
-        )
+        _delete_project_stmt, {"project_id": project_id, "owner_id": current_user.id}
     )
-    project = result.scalar_one_or_none()
     
-    if not project:
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
     
-    await db.delete(project)
     await db.commit()
     
     return None
@@ -2,13 +2,19 @@
 Task management endpoints.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select, insert, update, delete, literal, func, and_, or_, bindparam, lambda_stmt
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
+from pydantic import TypeAdapter
 from datetime import datetime
 
+from app.core.caching import build_etag, etag_matches, not_modified
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.pagination import encode_cursor, seek_after
 from app.core.security import get_current_active_user
 from app.models.user import User
 from app.models.project import Project
@@ -16,66 +22,137 @@ from app.models.task import Task, TaskStatus, TaskPriority
 from app.schemas.task import (
     Task as TaskSchema,
     TaskCreate,
+    TaskBulkCreate,
     TaskUpdate,
     TaskWithProject
 )
+from app.schemas.user import User as UserSchema
 
 router = APIRouter()
 
+_owned_project_ids = select(Project.id).where(Project.owner_id == bindparam("owner_id"))
+_get_owned_project_stmt = lambda_stmt(
+    lambda: select(Project).where(
+        and_(
+            Project.id == bindparam("project_id"),
+            Project.owner_id == bindparam("owner_id")
+        )
+    )
+)
+_get_task_stmt = lambda_stmt(
+    lambda: select(Task)
+    .join(Project)
+    .options(
+        selectinload(Task.project).load_only(Project.name),
+        selectinload(Task.assigned_user).load_only(User.username)
+    )
+    .where(
+        and_(
+            Task.id == bindparam("task_id"),
+            Project.owner_id == bindparam("owner_id")
+        )
+    )
+)
+_delete_task_stmt = lambda_stmt(
+    lambda: delete(Task).where(
+        and_(
+            Task.id == bindparam("task_id"),
+            Task.project_id.in_(_owned_project_ids)
+        )
+    )
+)
+
+# Validates and encodes task listings in a single pass inside pydantic-core
+_task_list_adapter = TypeAdapter(List[TaskWithProject])
+
 
 @router.get("/", response_model=List[TaskWithProject])
 async def get_tasks(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     status: Optional[TaskStatus] = None,
     priority: Optional[TaskPriority] = None,
     project_id: Optional[int] = None,
-    current_user: User = Depends(get_current_active_user),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    current_user: UserSchema = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get user's tasks with filtering and pagination."""
-    query = select(Task).join(Project).where(Project.owner_id == current_user.id)
+    filters = [Project.owner_id == current_user.id]
     
     # Apply filters
     if status:
-        query = query.where(Task.status == status)
+        filters.append(Task.status == status)
     if priority:
-        query = query.where(Task.priority == priority)
+        filters.append(Task.priority == priority)
     if project_id:
-        query = query.where(Task.project_id == project_id)
+        filters.append(Task.project_id == project_id)
     
-    result = await db.execute(
-        query.offset(skip).limit(limit).order_by(Task.created_at.desc())
+    # Fingerprint the filtered tasks, and the assignees whose usernames they
+    # show, so an unchanged listing can be answered with 304
+    fingerprint = await db.execute(
+        select(
+            func.max(Task.updated_at),
+            func.max(Project.updated_at),
+            func.max(User.updated_at),
+            func.count(Task.id)
+        )
+        .select_from(Task)
+        .join(Project)
+        .outerjoin(User, Task.assigned_to == User.id)
+        .where(*filters)
+    )
+    etag = build_etag(
+        current_user.id, *fingerprint.one(), status, priority, project_id, skip, limit, after
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    headers = {"ETag": etag}
+    
+    query = (
+        select(Task)
+        .join(Project)
+        # Related rows only contribute project_name and assigned_username
+        .options(
+            selectinload(Task.project).load_only(Project.name),
+            selectinload(Task.assigned_user).load_only(User.username)
+        )
+        .where(*filters)
+    )
+    if after:
+        query = query.where(seek_after(Task, after))
+    
+    # Stream the page in batches so the driver never buffers every wide row at once
+    result = await db.stream_scalars(
+        query.offset(skip).limit(limit).order_by(Task.created_at.desc(), Task.id.desc())
+        .execution_options(yield_per=settings.DB_YIELD_PER)
     )
-    tasks = result.scalars().all()
+    tasks = [task async for task in result]
     
-    # Convert to response format
-    task_responses = []
-    for task in tasks:
-        task_dict = task.__dict__.copy()
-        task_dict['project_name'] = task.project.name if task.project else None
-        task_dict['assigned_username'] = task.assigned_user.username if task.assigned_user else None
-        task_responses.append(TaskWithProject(**task_dict))
+    if len(tasks) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(tasks[-1].created_at, tasks[-1].id)
     
-    return task_responses
+    # Returning the encoded body directly skips FastAPI's second pass of
+    # response_model validation and JSON rendering for the largest listing
+    return Response(
+        content=_task_list_adapter.dump_json(
+            _task_list_adapter.validate_python(tasks, from_attributes=True)
+        ),
+        media_type="application/json",
+        headers=headers
+    )
 
 
 @router.get("/{task_id}", response_model=TaskWithProject)
 async def get_task(
     task_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserSchema = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific task by ID."""
     result = await db.execute(
-        select(Task)
-        .join(Project)
-        .where(
-            and_(
-                Task.id == task_id,
-                Project.owner_id == current_user.id
-            )
-        )
+        _get_task_stmt, {"task_id": task_id, "owner_id": current_user.id}
     )
     task = result.scalar_one_or_none()
     
@@ -85,86 +162,135 @@ async def get_task(
             detail="Task not found"
         )
     
-    task_dict = task.__dict__.copy()
-    task_dict['project_name'] = task.project.name if task.project else None
-    task_dict['assigned_username'] = task.assigned_user.username if task.assigned_user else None
-    
-    return TaskWithProject(**task_dict)
+    return task
 
 
 @router.post("/", response_model=TaskSchema, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task_data: TaskCreate,
     project_id: int = Query(..., description="Project ID for the task"),
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserSchema = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new task in a project."""
-    # Verify project exists and user owns it
+    # Create task, selecting the project row so the insert only happens
+    # when the project exists and belongs to the current user. The
+    # assigned user is validated by its foreign key rather than a SELECT.
+    try:
+        result = await db.execute(
+            insert(Task)
+            .from_select(
+                ["title", "description", "status", "priority", "assigned_to", "due_date", "project_id"],
+                select(
+                    literal(task_data.title, Task.title.type),
+                    literal(task_data.description, Task.description.type),
+                    literal(task_data.status, Task.status.type),
+                    literal(task_data.priority, Task.priority.type),
+                    literal(task_data.assigned_to, Task.assigned_to.type),
+                    literal(task_data.due_date, Task.due_date.type),
+                    Project.id
+                ).where(
+                    and_(
+                        Project.id == project_id,
+                        Project.owner_id == current_user.id
+                    )
+                )
+            )
+            .returning(Task)
+        )
+    except IntegrityError:
+        # project_id comes from an existing row, so only assigned_to can fail
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Assigned user not found"
+        )
+    db_task = result.scalar_one_or_none()
+    
+    if not db_task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    await db.commit()
+    
+    return db_task
+
+
+@router.post("/bulk", response_model=List[TaskSchema], status_code=status.HTTP_201_CREATED)
+async def create_tasks_bulk(
+    tasks_data: List[TaskBulkCreate] = Body(..., min_length=1, max_length=settings.MAX_BULK_TASKS),
+    current_user: UserSchema = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create several tasks, possibly across projects, in one transaction."""
+    # Verify every referenced project exists and is owned by the user
+    project_ids = {task_data.project_id for task_data in tasks_data}
     result = await db.execute(
-        select(Project).where(
+        select(Project.id).where(
             and_(
-                Project.id == project_id,
+                Project.id.in_(project_ids),
                 Project.owner_id == current_user.id
             )
         )
     )
-    project = result.scalar_one_or_none()
-    
-    if not project:
+    if set(result.scalars().all()) != project_ids:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
     
-    # Verify assigned user exists if provided
-    if task_data.assigned_to:
-        result = await db.execute(
-            select(User).where(User.id == task_data.assigned_to)
+    # Create all tasks with a single batched INSERT ... RETURNING; assigned
+    # users are validated by their foreign key
+    try:
+        result = await db.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True),
+            [task_data.model_dump() for task_data in tasks_data]
         )
-        assigned_user = result.scalar_one_or_none()
-        if not assigned_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Assigned user not found"
-            )
-    
-    # Create task
-    db_task = Task(
-        title=task_data.title,
-        description=task_data.description,
-        status=task_data.status,
-        priority=task_data.priority,
-        project_id=project_id,
-        assigned_to=task_data.assigned_to,
-        due_date=task_data.due_date
-    )
-    
-    db.add(db_task)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Assigned user not found"
+        )
+    db_tasks = result.all()
     await db.commit()
-    await db.refresh(db_task)
     
-    return db_task
+    return db_tasks
 
 
 @router.put("/{task_id}", response_model=TaskSchema)
 async def update_task(
     task_id: int,
     task_update: TaskUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserSchema = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Update a task."""
-    result = await db.execute(
-        select(Task)
-        .join(Project)
-        .where(
-            and_(
-                Task.id == task_id,
-                Project.owner_id == current_user.id
+    # Update task fields; the assigned user is validated by its foreign key
+    update_data = task_update.model_dump(exclude_unset=True)
+    try:
+        result = await db.execute(
+            update(Task)
+            .where(
+                and_(
+                    Task.id == task_id,
+                    Task.project_id.in_(_owned_project_ids)
+                )
             )
+            .values(update_data)
+            .returning(Task)
+            .execution_options(populate_existing=True),
+            {"owner_id": current_user.id}
+        )
+    except IntegrityError:
+        # assigned_to is the only foreign key a TaskUpdate can change
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Assigned user not found"
         )
-    )
     task = result.scalar_one_or_none()
     
     if not task:
@@ -173,25 +299,7 @@ async def update_task(
             detail="Task not found"
         )
     
-    # Verify assigned user exists if provided
-    if task_update.assigned_to:
-        result = await db.execute(
-            select(User).where(User.id == task_update.assigned_to)
-        )
-        assigned_user = result.scalar_one_or_none()
-        if not assigned_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Assigned user not found"
-            )
-    
-    # Update task fields
-    update_data = task_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(task, field, value)
-    
     await db.commit()
-    await db.refresh(task)
     
     return task
 
@@ -199,29 +307,20 @@ async def update_task(
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(
     task_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserSchema = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a task."""
     result = await db.execute(
-        select(Task)
-        .join(Project)
-        .where(
-            and_(
-                Task.id == task_id,
-                Project.owner_id == current_user.id
-            )
-        )
+        _delete_task_stmt, {"task_id": task_id, "owner_id": current_user.id}
     )
-    task = result.scalar_one_or_none()
     
-    if not task:
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
-    await db.delete(task)
     await db.commit()
     
     return None
@@ -230,22 +329,20 @@ async def delete_task(
 @router.get("/project/{project_id}/tasks", response_model=List[TaskWithProject])
 async def get_project_tasks(
     project_id: int,
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     task_status: Optional[TaskStatus] = None,
     priority: Optional[TaskPriority] = None,
-    current_user: User = Depends(get_current_active_user),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    current_user: UserSchema = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get tasks for a specific project."""
     # Verify project exists and user owns it
     result = await db.execute(
-        select(Project).where(
-            and_(
-                Project.id == project_id,
-                Project.owner_id == current_user.id
-            )
-        )
+        _get_owned_project_stmt, {"project_id": project_id, "owner_id": current_user.id}
     )
     project = result.scalar_one_or_none()
     
@@ -255,26 +352,46 @@ async def get_project_tasks(
             detail="Project not found"
         )
     
-    # Build query
-    query = select(Task).where(Task.project_id == project_id)
+    filters = [Task.project_id == project_id]
     
     if task_status:
-        query = query.where(Task.status == task_status)
+        filters.append(Task.status == task_status)
     if priority:
-        query = query.where(Task.priority == priority)
+        filters.append(Task.priority == priority)
     
-    result = await db.execute(
-        query.offset(skip).limit(limit).order_by(Task.created_at.desc())
+    # Fingerprint the filtered tasks and their assignees so an unchanged
+    # listing can be answered with 304
+    fingerprint = await db.execute(
+        select(func.max(Task.updated_at), func.max(User.updated_at), func.count(Task.id))
+        .select_from(Task)
+        .outerjoin(User, Task.assigned_to == User.id)
+        .where(*filters)
+    )
+    etag = build_etag(
+        project.id, project.updated_at, *fingerprint.one(), task_status, priority, skip, limit, after
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    
+    # Build query
+    query = (
+        select(Task)
+        .options(selectinload(Task.assigned_user).load_only(User.username))
+        .where(*filters)
+    )
+    if after:
+        query = query.where(seek_after(Task, after))
+    
+    result = await db.stream_scalars(
+        query.offset(skip).limit(limit).order_by(Task.created_at.desc(), Task.id.desc())
+        .execution_options(yield_per=settings.DB_YIELD_PER)
     )
-    tasks = result.scalars().all()
+    tasks = [task async for task in result]
     
-    # Convert to response format
-    task_responses = []
-    for task in tasks:
-        task_dict = task.__dict__.copy()
-        task_dict['project_name'] = project.name
-        task_dict['assigned_username'] = task.assigned_user.username if task.assigned_user else None
-        task_responses.append(TaskWithProject(**task_dict))
+    if len(tasks) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(tasks[-1].created_at, tasks[-1].id)
     
-    return task_responses
+    # Task.project resolves from the identity map, the project was loaded above
+    return tasks
 
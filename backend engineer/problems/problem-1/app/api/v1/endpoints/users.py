@@ -4,10 +4,10 @@ User management endpoints.
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 
 from app.core.database import get_db
-from app.core.security import get_current_active_user
+from app.core.security import get_current_active_user, invalidate_cached_user
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserUpdate
 
@@ -16,7 +16,7 @@ router = APIRouter()
 
 @router.get("/me", response_model=UserSchema)
 async def get_current_user(
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserSchema = Depends(get_current_active_user)
 ):
     """Get current user profile."""
     return current_user
@@ -25,7 +25,7 @@ async def get_current_user(
 @router.put("/me", response_model=UserSchema)
 async def update_current_user(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserSchema = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Update current user profile."""
@@ -55,11 +55,17 @@ async def update_current_user(
     
     # Update user fields
     update_data = user_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(current_user, field, value)
-    
+    previous_username = current_user.username
+    result = await db.execute(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(update_data)
+        .returning(User)
+        .execution_options(populate_existing=True)
+    )
+    user = result.scalar_one()
     await db.commit()
-    await db.refresh(current_user)
+    invalidate_cached_user(previous_username, user.username)
     
-    return current_user
+    return user
 
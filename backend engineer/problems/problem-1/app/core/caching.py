@@ -0,0 +1,29 @@
+"""
+HTTP caching helpers for conditional GET requests.
+"""
+
+import hashlib
+from typing import Any
+from fastapi import Request, Response, status
+
+
+def build_etag(*parts: Any) -> str:
+    """Build a strong ETag from the values that determine a response body."""
+    fingerprint = "-".join(str(part) for part in parts)
+    digest = hashlib.blake2b(fingerprint.encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header matches the ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+def not_modified(etag: str) -> Response:
+    """Build an empty 304 response carrying the current ETag."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -2,33 +2,60 @@
 Security utilities for authentication and password hashing.
 """
 
+import asyncio
 from datetime import datetime, timedelta
 from typing import Optional, Union
-from jose import JWTError, jwt
+import jwt
 from passlib.context import CryptContext
+from cachetools import TTLCache
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.config import settings
 from app.core.database import get_db
 from app.models.user import User
+from app.schemas.user import User as UserSchema
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import defer
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context (argon2 for new hashes, bcrypt kept to verify existing ones)
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=2,
+    argon2__memory_cost=19456,
+    argon2__parallelism=1,
+)
 
 # JWT token scheme
 security = HTTPBearer()
 
+# Signing parameters are fixed for the process, so they are built once
+# instead of on every token operation
+_JWT_KEY = settings.SECRET_KEY.encode()
+_JWT_ALGORITHMS = [settings.ALGORITHM]
+_JWT_DECODE_OPTIONS = {"require": ["exp", "sub"]}
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+# Recently authenticated users keyed by username, so that every request
+# carrying a token doesn't have to re-read the user row. Entries are plain
+# snapshots: an ORM instance would stay tied to the session that loaded it
+# and break once that session rolls back or closes
+user_cache: TTLCache = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
 
 
-def get_password_hash(password: str) -> str:
-    """Hash a password."""
-    return pwd_context.hash(password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash in a worker thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, pwd_context.verify, plain_password, hashed_password)
+
+
+async def get_password_hash(password: str) -> str:
+    """Hash a password in a worker thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, pwd_context.hash, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -40,26 +67,31 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
 def verify_token(token: str) -> Optional[str]:
     """Verify and decode a JWT token."""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-        return username
-    except JWTError:
+        payload = jwt.decode(
+            token, _JWT_KEY, algorithms=_JWT_ALGORITHMS, options=_JWT_DECODE_OPTIONS
+        )
+        return payload["sub"]
+    except jwt.PyJWTError:
         return None
 
 
+def invalidate_cached_user(*usernames: str) -> None:
+    """Drop cached users so the next request reloads them from the database."""
+    for username in usernames:
+        user_cache.pop(username, None)
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> UserSchema:
     """Get the current authenticated user."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -72,17 +104,27 @@ async def get_current_user(
     if username is None:
         raise credentials_exception
     
-    result = await db.execute(select(User).where(User.username == username))
-    user = result.scalar_one_or_none()
-    if user is None:
+    user = user_cache.get(username)
+    if user is not None:
+        return user
+    
+    result = await db.execute(
+        select(User)
+        .options(defer(User.hashed_password))
+        .where(User.username == username)
+    )
+    db_user = result.scalar_one_or_none()
+    if db_user is None:
         raise credentials_exception
     
+    user = UserSchema.model_validate(db_user)
+    user_cache[username] = user
     return user
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserSchema = Depends(get_current_user)
+) -> UserSchema:
     """Get the current active user."""
     if not current_user.is_active:
         raise HTTPException(
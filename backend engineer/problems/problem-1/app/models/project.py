@@ -2,8 +2,8 @@
 Project model for the Task Management API.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship, query_expression
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -13,7 +13,7 @@ class Project(Base):
     
     __tablename__ = "projects"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
     owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -22,7 +22,15 @@ class Project(Base):
     
     # Relationships
     owner = relationship("User", back_populates="owned_projects")
-    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
+    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    
+    # Populated by listing queries through with_expression()
+    task_count = query_expression()
+    
+    __table_args__ = (
+        # Keyset pagination over a user's projects
+        Index("ix_projects_owner_id_created_at_id", owner_id, created_at.desc(), id.desc()),
+    )
     
     def __repr__(self) -> str:
         return f"<Project(id={self.id}, name='{self.name}', owner_id={self.owner_id})>"
@@ -2,10 +2,11 @@
 Task model for the Task Management API.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
+from typing import Optional
 from app.core.database import Base
 
 
@@ -30,8 +31,8 @@ class Task(Base):
     
     __tablename__ = "tasks"
     
-    id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(255), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     status = Column(Enum(TaskStatus), default=TaskStatus.PENDING, nullable=False)
     priority = Column(Enum(TaskPriority), default=TaskPriority.MEDIUM, nullable=False)
@@ -45,6 +46,23 @@ class Task(Base):
     project = relationship("Project", back_populates="tasks")
     assigned_user = relationship("User", back_populates="assigned_tasks")
     
+    __table_args__ = (
+        # Keyset pagination over a project's tasks
+        Index("ix_tasks_project_id_created_at_id", project_id, created_at.desc(), id.desc()),
+        # Status filter on project task listings
+        Index("ix_tasks_project_id_status", project_id, status),
+    )
+    
+    @property
+    def project_name(self) -> Optional[str]:
+        """Name of the project the task belongs to."""
+        return self.project.name if self.project else None
+    
+    @property
+    def assigned_username(self) -> Optional[str]:
+        """Username of the assigned user, if any."""
+        return self.assigned_user.username if self.assigned_user else None
+    
     def __repr__(self) -> str:
         return f"<Task(id={self.id}, title='{self.title}', status='{self.status}')>"
 
@@ -22,6 +22,11 @@ class TaskCreate(TaskBase):
     assigned_to: Optional[int] = None
 
 
+class TaskBulkCreate(TaskCreate):
+    """Schema for a task in a bulk creation request."""
+    project_id: int
+
+
 class TaskUpdate(BaseModel):
     """Schema for task updates."""
     title: Optional[str] = Field(None, min_length=1, max_length=255)
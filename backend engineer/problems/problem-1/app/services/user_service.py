@@ -3,11 +3,11 @@ User service for database operations.
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update
 from typing import Optional
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash, invalidate_cached_user
 
 
 class UserService:
@@ -34,26 +34,35 @@ class UserService:
     @staticmethod
     async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
         """Create a new user."""
-        hashed_password = get_password_hash(user_data.password)
-        db_user = User(
-            email=user_data.email,
-            username=user_data.username,
-            hashed_password=hashed_password
+        hashed_password = await get_password_hash(user_data.password)
+        result = await db.execute(
+            insert(User)
+            .values(
+                email=user_data.email,
+                username=user_data.username,
+                hashed_password=hashed_password
+            )
+            .returning(User)
         )
-        db.add(db_user)
+        db_user = result.scalar_one()
         await db.commit()
-        await db.refresh(db_user)
         return db_user
     
     @staticmethod
     async def update_user(db: AsyncSession, user: User, user_update: UserUpdate) -> User:
         """Update user information."""
         update_data = user_update.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(user, field, value)
-        
+        previous_username = user.username
+        result = await db.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(update_data)
+            .returning(User)
+            .execution_options(populate_existing=True)
+        )
+        user = result.scalar_one()
         await db.commit()
-        await db.refresh(user)
+        invalidate_cached_user(previous_username, user.username)
         return user
     
     @staticmethod
@@ -5,11 +5,12 @@ A RESTful API for managing tasks and projects with user authentication.
 
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine
 from app.api.v1.api import api_router
 from app.core.exceptions import (
     TaskManagementException,
@@ -20,9 +21,8 @@ from app.core.exceptions import (
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
-    # Startup
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Startup: the schema is managed by Alembic (`alembic upgrade head`),
+    # so booting a replica issues no DDL
     yield
     # Shutdown
     await engine.dispose()
@@ -35,6 +35,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
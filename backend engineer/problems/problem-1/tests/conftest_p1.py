@@ -5,7 +5,9 @@ Test configuration and fixtures.
 import pytest
 import pytest_asyncio
 import asyncio
-from httpx import AsyncClient
+from httpx import AsyncClient, ASGITransport
+from passlib.context import CryptContext
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -13,25 +15,38 @@ from main import app
 from app.core.database import get_db, Base
 from app.core.config import settings
 from app.models.user import User
-from app.core.security import get_password_hash
+from app.models.project import Project
+from app.models.task import Task
+from app.core import security
+from app.core.security import create_access_token, get_password_hash, user_cache
 
 
-# Test database URL
+# Test database URL; every process, including each pytest-xdist worker,
+# gets its own private in-memory database
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
-# Create test engine
-test_engine = create_async_engine(
-    TEST_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
+def configure_sqlite_connection(dbapi_connection, connection_record):
+    """Enforce foreign keys like PostgreSQL and drop durability work."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    # The test database is thrown away, so skip syncs and keep the
+    # rollback journal and temporary tables in memory
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+    # Let SQLAlchemy emit BEGIN itself; the driver's implicit transaction
+    # handling breaks the SAVEPOINTs each test runs inside
+    dbapi_connection.isolation_level = None
 
-# Create test session factory
-TestSessionLocal = async_sessionmaker(
-    test_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+
+def begin_sqlite_transaction(conn):
+    """Start transactions explicitly for SAVEPOINT support."""
+    conn.exec_driver_sql("BEGIN")
+
+
+# Whether the schema and baseline rows exist yet in the shared in-memory database
+_schema_created = False
 
 
 @pytest.fixture(scope="session")
@@ -42,56 +57,165 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing():
+    """Swap the production password hasher for a cheap one during tests."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(security, "pwd_context", CryptContext(schemes=["plaintext"]))
+        yield
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """Create the engine shared by every test in the session."""
+    engine = create_async_engine(
+        TEST_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    event.listen(engine.sync_engine, "connect", configure_sqlite_connection)
+    event.listen(engine.sync_engine, "begin", begin_sqlite_transaction)
+    return engine
+
+
+@pytest.fixture(scope="session")
+def session_factory(engine):
+    """Create the session factory shared by every test in the session."""
+    return async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+
+
 @pytest_asyncio.fixture
-async def db_session():
-    """Create a test database session."""
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    
-    async with TestSessionLocal() as session:
+async def init_database(engine, session_factory):
+    """Create the database schema and baseline rows on first use."""
+    global _schema_created
+    # The in-memory database lives as long as the StaticPool connection, so
+    # the schema is created once per session. This is a plain async fixture
+    # because pytest-asyncio's event_loop is function scoped when this module
+    # is loaded with -p.
+    if not _schema_created:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        
+        # Baseline rows are committed outside any test's transaction, so
+        # every test sees them and per-test rollbacks never remove them
+        async with session_factory() as session:
+            session.add(User(
+                email="test@example.com",
+                username="testuser",
+                hashed_password=await get_password_hash("testpassword"),
+                is_active=True
+            ))
+            await session.commit()
+        _schema_created = True
+
+
+@pytest_asyncio.fixture
+async def db_session(engine, session_factory, init_database):
+    """Create a test database session rolled back after each test."""
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        # Commits and rollbacks issued by tests or endpoints only act on
+        # a SAVEPOINT inside the outer transaction
+        session = session_factory(bind=conn, join_transaction_mode="create_savepoint")
+        
         yield session
-        await session.rollback()
-    
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+        
+        await session.close()
+        await trans.rollback()
+
+
+@pytest.fixture(scope="session")
+def http_client():
+    """Create one in-process HTTP client for the whole session."""
+    # ASGITransport keeps no connections open, so the client needs no
+    # per-test setup or teardown
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
 
 
 @pytest_asyncio.fixture
-async def client(db_session):
+async def client(http_client, db_session):
     """Create a test client with database session override."""
     def override_get_db():
         return db_session
     
     app.dependency_overrides[get_db] = override_get_db
     
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        yield ac
+    yield http_client
     
     app.dependency_overrides.clear()
+    user_cache.clear()
+
+
+@pytest_asyncio.fixture
+async def per_request_client(http_client, db_session, session_factory):
+    """Create a test client that opens a fresh session for every request."""
+    # Each request's session is closed when it finishes, as in production,
+    # so state leaking between requests through ORM objects shows up here
+    async def override_get_db():
+        async with session_factory(bind=db_session.bind, join_transaction_mode="create_savepoint") as session:
+            yield session
+    
+    app.dependency_overrides[get_db] = override_get_db
+    
+    yield http_client
+    
+    app.dependency_overrides.clear()
+    user_cache.clear()
 
 
 @pytest_asyncio.fixture
 async def test_user(db_session):
-    """Create a test user."""
-    user = User(
-        email="test@example.com",
-        username="testuser",
-        hashed_password=get_password_hash("testpassword"),
-        is_active=True
+    """Get the test user seeded with the baseline database."""
+    result = await db_session.execute(
+        select(User).where(User.username == "testuser")
     )
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
-    return user
+    return result.scalar_one()
+
+
+@pytest_asyncio.fixture
+async def project_factory(db_session, test_user):
+    """Create projects owned by the test user."""
+    async def create_project(**fields) -> Project:
+        project = Project(**{
+            "name": "Test Project",
+            "description": "A test project",
+            "owner_id": test_user.id,
+            **fields
+        })
+        db_session.add(project)
+        # Flushing assigns the primary key without ending the test's transaction
+        await db_session.flush()
+        return project
+    
+    return create_project
+
+
+@pytest_asyncio.fixture
+async def task_factory(db_session):
+    """Create tasks in a given project."""
+    async def create_task(project: Project, **fields) -> Task:
+        task = Task(**{"title": "Test Task", **fields}, project_id=project.id)
+        db_session.add(task)
+        await db_session.flush()
+        return task
+    
+    return create_task
+
+
+@pytest.fixture(scope="session")
+def auth_token():
+    """Mint one access token for the seeded test user per session."""
+    # Minting the token directly skips a password verification per test;
+    # the login endpoints themselves are covered in test_auth
+    return create_access_token(data={"sub": "testuser"})
 
 
 @pytest_asyncio.fixture
-async def auth_headers(client, test_user):
+async def auth_headers(client, test_user, auth_token):
     """Get authentication headers for test user."""
-    response = await client.post(
-        "/api/v1/auth/login",
-        json={"username": "testuser", "password": "testpassword"}
-    )
-    token = response.json()["access_token"]
-    return {"Authorization": f"Bearer {token}"}
+    return {"Authorization": f"Bearer {auth_token}"}
 
@@ -30,42 +30,32 @@ class TestAuth:
         assert "hashed_password" not in data
     
     @pytest.mark.asyncio
-    async def test_register_user_duplicate_email(self, client, test_user):
-        """Test registration with duplicate email."""
+    @pytest.mark.parametrize("email, username, detail", [
+        ("test@example.com", "differentuser", "Email already registered"),
+        ("different@example.com", "testuser", "Username already taken"),
+    ], ids=["duplicate_email", "duplicate_username"])
+    async def test_register_user_duplicate(self, client, test_user, email, username, detail):
+        """Test registration with an already registered email or username."""
         user_data = {
-            "email": "test@example.com",
-            "username": "differentuser",
+            "email": email,
+            "username": username,
             "password": "password123"
         }
         
         response = await client.post("/api/v1/auth/register", json=user_data)
         
         assert response.status_code == 400
-        assert "Email already registered" in response.json()["detail"]
+        assert detail in response.json()["detail"]
     
     @pytest.mark.asyncio
-    async def test_register_user_duplicate_username(self, client, test_user):
-        """Test registration with duplicate username."""
-        user_data = {
-            "email": "different@example.com",
-            "username": "testuser",
-            "password": "password123"
-        }
-        
-        response = await client.post("/api/v1/auth/register", json=user_data)
-        
-        assert response.status_code == 400
-        assert "Username already taken" in response.json()["detail"]
-    
-    @pytest.mark.asyncio
-    async def test_register_user_invalid_data(self, client):
+    @pytest.mark.parametrize("user_data", [
+        {"email": "invalid-email", "username": "ab", "password": "123"},
+        {"email": "invalid-email", "username": "validuser", "password": "password123"},
+        {"email": "valid@example.com", "username": "ab", "password": "password123"},
+        {"email": "valid@example.com", "username": "validuser", "password": "123"},
+    ], ids=["all_invalid", "invalid_email", "short_username", "short_password"])
+    async def test_register_user_invalid_data(self, client, user_data):
         """Test registration with invalid data."""
-        user_data = {
-            "email": "invalid-email",
-            "username": "ab",  # Too short
-            "password": "123"   # Too short
-        }
-        
         response = await client.post("/api/v1/auth/register", json=user_data)
         
         assert response.status_code == 422
@@ -86,22 +76,15 @@ class TestAuth:
         assert data["token_type"] == "bearer"
     
     @pytest.mark.asyncio
-    async def test_login_invalid_credentials(self, client, test_user):
-        """Test login with invalid credentials."""
-        login_data = {
-            "username": "testuser",
-            "password": "wrongpassword"
-        }
-        response = await client.post("/api/v1/auth/login", json=login_data)
-        assert response.status_code in (401, 403)
-        assert "Incorrect username or password" in response.json()["detail"]
-    
-    @pytest.mark.asyncio
-    async def test_login_nonexistent_user(self, client):
-        """Test login with nonexistent user."""
+    @pytest.mark.parametrize("username, password", [
+        ("testuser", "wrongpassword"),
+        ("nonexistent", "password123"),
+    ], ids=["wrong_password", "nonexistent_user"])
+    async def test_login_invalid_credentials(self, client, test_user, username, password):
+        """Test login with a wrong password or an unknown user."""
         login_data = {
-            "username": "nonexistent",
-            "password": "password123"
+            "username": username,
+            "password": password
         }
         response = await client.post("/api/v1/auth/login", json=login_data)
         assert response.status_code in (401, 403)
@@ -118,6 +101,53 @@ class TestAuth:
         assert data["email"] == "test@example.com"
         assert "hashed_password" not in data
     
+    @pytest.mark.asyncio
+    async def test_get_current_user_after_deactivation(self, client, auth_headers):
+        """Test that deactivating a user takes effect on the next request."""
+        response = await client.get("/api/v1/auth/me", headers=auth_headers)
+        assert response.status_code == 200
+        
+        response = await client.put(
+            "/api/v1/users/me",
+            json={"is_active": False},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        
+        response = await client.get("/api/v1/auth/me", headers=auth_headers)
+        assert response.status_code == 400
+        assert "Inactive user" in response.json()["detail"]
+    
+    @pytest.mark.asyncio
+    async def test_get_current_user_after_rename(self, client, auth_headers):
+        """Test that a token for the old username stops working after a rename."""
+        response = await client.put(
+            "/api/v1/users/me",
+            json={"username": "renameduser"},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["username"] == "renameduser"
+        
+        response = await client.get("/api/v1/auth/me", headers=auth_headers)
+        assert response.status_code == 401
+    
+    @pytest.mark.asyncio
+    async def test_cached_user_survives_request_rollback(self, per_request_client, auth_headers, project_factory):
+        """Test that a request rolling back does not break the cached user for later requests."""
+        project = await project_factory()
+        
+        # The user is loaded and cached by a request that then rolls back
+        response = await per_request_client.post(
+            f"/api/v1/tasks/?project_id={project.id}",
+            json={"title": "Test Task", "assigned_to": 9999},
+            headers=auth_headers
+        )
+        assert response.status_code == 400
+        
+        response = await per_request_client.get("/api/v1/projects/", headers=auth_headers)
+        assert response.status_code == 200
+    
     @pytest.mark.asyncio
     async def test_get_current_user_unauthorized(self, client):
         """Test getting current user without authentication."""
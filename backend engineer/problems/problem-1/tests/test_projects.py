@@ -3,9 +3,12 @@ Test project endpoints.
 """
 
 import pytest
+from datetime import datetime, timedelta, timezone
 from httpx import AsyncClient
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.project import Project
+from app.models.task import Task
 
 
 class TestProjects:
@@ -51,7 +54,7 @@ class TestProjects:
         
         db_session.add(project1)
         db_session.add(project2)
-        await db_session.commit()
+        await db_session.flush()
         
         response = await client.get("/api/v1/projects/", headers=auth_headers)
         
@@ -61,18 +64,67 @@ class TestProjects:
         assert data[0]["name"] in ["Project 1", "Project 2"]
         assert data[1]["name"] in ["Project 1", "Project 2"]
     
+    @pytest.mark.asyncio
+    async def test_get_projects_task_count(self, client, auth_headers, db_session, test_user):
+        """Test that project listing reports the number of tasks per project."""
+        busy = Project(name="Busy Project", description="Has tasks", owner_id=test_user.id)
+        empty = Project(name="Empty Project", description="No tasks", owner_id=test_user.id)
+        db_session.add_all([busy, empty])
+        await db_session.flush()
+        
+        await db_session.execute(
+            insert(Task),
+            [{"title": f"Task {i}", "project_id": busy.id} for i in range(3)]
+        )
+        await db_session.flush()
+        
+        response = await client.get("/api/v1/projects/", headers=auth_headers)
+        
+        assert response.status_code == 200
+        counts = {project["name"]: project["task_count"] for project in response.json()}
+        assert counts == {"Busy Project": 3, "Empty Project": 0}
+    
+    @pytest.mark.asyncio
+    async def test_get_projects_conditional_get(self, client, auth_headers, db_session, test_user):
+        """Test that unchanged project listings are answered with 304."""
+        project = Project(name="Cached Project", description="A project", owner_id=test_user.id)
+        db_session.add(project)
+        await db_session.flush()
+        
+        response = await client.get("/api/v1/projects/", headers=auth_headers)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        
+        conditional_headers = {**auth_headers, "If-None-Match": etag}
+        response = await client.get("/api/v1/projects/", headers=conditional_headers)
+        assert response.status_code == 304
+        assert response.content == b""
+        
+        # Adding a task changes the task count, so the listing is stale
+        db_session.add(Task(title="New Task", project_id=project.id))
+        await db_session.flush()
+        
+        response = await client.get("/api/v1/projects/", headers=conditional_headers)
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()[0]["task_count"] == 1
+    
     @pytest.mark.asyncio
     async def test_get_projects_pagination(self, client, auth_headers, db_session, test_user):
         """Test project pagination."""
         # Create multiple projects
-        for i in range(25):
-            project = Project(
-                name=f"Project {i}",
-                description=f"Project {i} description",
-                owner_id=test_user.id
-            )
-            db_session.add(project)
-        await db_session.commit()
+        await db_session.execute(
+            insert(Project),
+            [
+                {
+                    "name": f"Project {i}",
+                    "description": f"Project {i} description",
+                    "owner_id": test_user.id
+                }
+                for i in range(25)
+            ]
+        )
+        await db_session.flush()
         
         # Test first page
         response = await client.get("/api/v1/projects/?skip=0&limit=10", headers=auth_headers)
@@ -86,6 +138,42 @@ class TestProjects:
         data = response.json()
         assert len(data) == 10
     
+    @pytest.mark.asyncio
+    async def test_get_projects_cursor_pagination(self, client, auth_headers, db_session, test_user):
+        """Test walking project pages with the X-Next-Cursor header."""
+        base_time = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        await db_session.execute(
+            insert(Project),
+            [
+                {
+                    "name": f"Project {i}",
+                    "owner_id": test_user.id,
+                    "created_at": base_time + timedelta(minutes=i)
+                }
+                for i in range(25)
+            ]
+        )
+        await db_session.flush()
+        
+        seen = []
+        url = "/api/v1/projects/?limit=10"
+        while url:
+            response = await client.get(url, headers=auth_headers)
+            assert response.status_code == 200
+            seen.extend(project["name"] for project in response.json())
+            cursor = response.headers.get("x-next-cursor")
+            url = f"/api/v1/projects/?limit=10&after={cursor}" if cursor else None
+        
+        assert seen == [f"Project {i}" for i in reversed(range(25))]
+    
+    @pytest.mark.asyncio
+    async def test_get_projects_invalid_cursor(self, client, auth_headers):
+        """Test that a malformed cursor is rejected."""
+        response = await client.get("/api/v1/projects/?after=not-a-cursor", headers=auth_headers)
+        
+        assert response.status_code == 400
+        assert "Invalid pagination cursor" in response.json()["detail"]
+    
     @pytest.mark.asyncio
     async def test_get_project_by_id(self, client, auth_headers, db_session, test_user):
         """Test getting a specific project by ID."""
@@ -95,8 +183,7 @@ class TestProjects:
             owner_id=test_user.id
         )
         db_session.add(project)
-        await db_session.commit()
-        await db_session.refresh(project)
+        await db_session.flush()
         
         response = await client.get(f"/api/v1/projects/{project.id}", headers=auth_headers)
         
@@ -122,8 +209,7 @@ class TestProjects:
             owner_id=test_user.id
         )
         db_session.add(project)
-        await db_session.commit()
-        await db_session.refresh(project)
+        await db_session.flush()
         response = await client.get(f"/api/v1/projects/{project.id}")
         assert response.status_code in (401, 403)
     
@@ -136,8 +222,7 @@ class TestProjects:
             owner_id=test_user.id
         )
         db_session.add(project)
-        await db_session.commit()
-        await db_session.refresh(project)
+        await db_session.flush()
         
         update_data = {
             "name": "Updated Name",
@@ -178,8 +263,7 @@ class TestProjects:
             owner_id=test_user.id
         )
         db_session.add(project)
-        await db_session.commit()
-        await db_session.refresh(project)
+        await db_session.flush()
         
         response = await client.delete(f"/api/v1/projects/{project.id}", headers=auth_headers)
         
@@ -3,27 +3,23 @@ Test task endpoints.
 """
 
 import pytest
+from datetime import datetime
 from httpx import AsyncClient
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.project import Project
-from app.models.task import Task, TaskStatus, TaskPriority
+from app.core.security import create_access_token
+from app.models.task import TaskStatus, TaskPriority
+from app.models.user import User
 
 
 class TestTasks:
     """Test task management functionality."""
     
     @pytest.mark.asyncio
-    async def test_create_task_success(self, client, auth_headers, db_session, test_user):
+    async def test_create_task_success(self, client, auth_headers, test_user, project_factory):
         """Test successful task creation."""
         # Create a project first
-        project = Project(
-            name="Test Project",
-            description="A test project",
-            owner_id=test_user.id
-        )
-        db_session.add(project)
-        await db_session.commit()
-        await db_session.refresh(project)
+        project = await project_factory()
         
         task_data = {
             "title": "Test Task",
@@ -66,16 +62,28 @@ class TestTasks:
         assert "Project not found" in response.json()["detail"]
     
     @pytest.mark.asyncio
-    async def test_create_task_unauthorized(self, client, db_session, test_user):
-        """Test creating a task without authentication."""
-        project = Project(
-            name="Test Project",
-            description="A test project",
-            owner_id=test_user.id
+    async def test_create_task_assigned_user_not_found(self, client, auth_headers, project_factory):
+        """Test creating a task assigned to a non-existent user."""
+        project = await project_factory()
+        
+        task_data = {
+            "title": "Test Task",
+            "assigned_to": 999
+        }
+        
+        response = await client.post(
+            f"/api/v1/tasks/?project_id={project.id}",
+            json=task_data,
+            headers=auth_headers
         )
-        db_session.add(project)
-        await db_session.commit()
-        await db_session.refresh(project)
+        
+        assert response.status_code == 400
+        assert "Assigned user not found" in response.json()["detail"]
+    
+    @pytest.mark.asyncio
+    async def test_create_task_unauthorized(self, client, project_factory):
+        """Test creating a task without authentication."""
+        project = await project_factory()
         
         task_data = {
             "title": "Test Task",
@@ -89,35 +97,63 @@ class TestTasks:
         assert response.status_code in (401, 403)
     
     @pytest.mark.asyncio
-    async def test_get_tasks(self, client, auth_headers, db_session, test_user):
+    async def test_create_tasks_bulk(self, client, auth_headers, test_user, project_factory):
+        """Test creating tasks across projects in one request."""
+        project1 = await project_factory(name="Project 1")
+        project2 = await project_factory(name="Project 2")
+        
+        tasks_data = [
+            {"title": "Task 1", "project_id": project1.id, "assigned_to": test_user.id},
+            {"title": "Task 2", "project_id": project2.id, "priority": "high"},
+            {"title": "Task 3", "project_id": project1.id}
+        ]
+        
+        response = await client.post("/api/v1/tasks/bulk", json=tasks_data, headers=auth_headers)
+        
+        assert response.status_code == 201
+        data = response.json()
+        assert [task["title"] for task in data] == ["Task 1", "Task 2", "Task 3"]
+        assert [task["project_id"] for task in data] == [project1.id, project2.id, project1.id]
+        assert data[0]["assigned_to"] == test_user.id
+        assert data[1]["priority"] == "high"
+    
+    @pytest.mark.asyncio
+    async def test_create_tasks_bulk_project_not_found(self, client, auth_headers, project_factory):
+        """Test that bulk creation fails when any project is missing."""
+        project = await project_factory()
+        
+        tasks_data = [
+            {"title": "Task 1", "project_id": project.id},
+            {"title": "Task 2", "project_id": 999}
+        ]
+        
+        response = await client.post("/api/v1/tasks/bulk", json=tasks_data, headers=auth_headers)
+        
+        assert response.status_code == 404
+        assert "Project not found" in response.json()["detail"]
+        
+        response = await client.get("/api/v1/tasks/", headers=auth_headers)
+        assert response.json() == []
+    
+    @pytest.mark.asyncio
+    async def test_get_tasks(self, client, auth_headers, project_factory, task_factory):
         """Test getting user's tasks."""
         # Create a project and tasks
-        project = Project(
-            name="Test Project",
-            description="A test project",
-            owner_id=test_user.id
-        )
-        db_session.add(project)
-        await db_session.commit()
-        await db_session.refresh(project)
+        project = await project_factory()
         
-        task1 = Task(
+        await task_factory(
+            project,
             title="Task 1",
             description="First task",
-            project_id=project.id,
             status=TaskStatus.PENDING
         )
-        task2 = Task(
+        await task_factory(
+            project,
             title="Task 2",
             description="Second task",
-            project_id=project.id,
             status=TaskStatus.IN_PROGRESS
         )
         
-        db_session.add(task1)
-        db_session.add(task2)
-        await db_session.commit()
-        
         response = await client.get("/api/v1/tasks/", headers=auth_headers)
         
         assert response.status_code == 200
@@ -127,35 +163,83 @@ class TestTasks:
         assert data[1]["title"] in ["Task 1", "Task 2"]
     
     @pytest.mark.asyncio
-    async def test_get_tasks_with_filters(self, client, auth_headers, db_session, test_user):
+    async def test_get_tasks_conditional_get(self, client, auth_headers, project_factory, task_factory):
+        """Test that unchanged task listings are answered with 304."""
+        project = await project_factory()
+        
+        await task_factory(project, title="Task 1")
+        
+        response = await client.get("/api/v1/tasks/", headers=auth_headers)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        
+        conditional_headers = {**auth_headers, "If-None-Match": etag}
+        response = await client.get("/api/v1/tasks/", headers=conditional_headers)
+        assert response.status_code == 304
+        
+        # Different filters produce a different representation
+        response = await client.get("/api/v1/tasks/?priority=high", headers=conditional_headers)
+        assert response.status_code == 200
+        
+        await task_factory(project, title="Task 2")
+        
+        response = await client.get("/api/v1/tasks/", headers=conditional_headers)
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+    
+    @pytest.mark.asyncio
+    async def test_get_tasks_conditional_get_after_assignee_rename(
+        self, client, auth_headers, db_session, test_user, project_factory, task_factory
+    ):
+        """Test that renaming an assignee makes cached task listings stale."""
+        project = await project_factory()
+        await task_factory(project, title="Assigned Task", assigned_to=test_user.id)
+        
+        # Backdate the user so the rename below is guaranteed a newer timestamp
+        await db_session.execute(
+            update(User).where(User.id == test_user.id).values(updated_at=datetime(2024, 1, 1))
+        )
+        await db_session.flush()
+        
+        etags = {}
+        for url in ("/api/v1/tasks/", f"/api/v1/tasks/project/{project.id}/tasks"):
+            response = await client.get(url, headers=auth_headers)
+            assert response.status_code == 200
+            etags[url] = response.headers["etag"]
+        
+        response = await client.put(
+            "/api/v1/users/me",
+            json={"username": "renameduser"},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        
+        # The old token no longer resolves, so sign in as the renamed user
+        renamed_headers = {"Authorization": f"Bearer {create_access_token(data={'sub': 'renameduser'})}"}
+        for url, etag in etags.items():
+            response = await client.get(url, headers={**renamed_headers, "If-None-Match": etag})
+            assert response.status_code == 200
+            assert response.json()[0]["assigned_username"] == "renameduser"
+    
+    @pytest.mark.asyncio
+    async def test_get_tasks_with_filters(self, client, auth_headers, project_factory, task_factory):
         """Test getting tasks with status and priority filters."""
         # Create a project and tasks
-        project = Project(
-            name="Test Project",
-            description="A test project",
-            owner_id=test_user.id
-        )
-        db_session.add(project)
-        await db_session.commit()
-        await db_session.refresh(project)
+        project = await project_factory()
         
-        task1 = Task(
+        await task_factory(
+            project,
             title="High Priority Task",
-            project_id=project.id,
             status=TaskStatus.PENDING,
             priority=TaskPriority.HIGH
         )
-        task2 = Task(
+        await task_factory(
+            project,
             title="Low Priority Task",
-            project_id=project.id,
             status=TaskStatus.COMPLETED,
             priority=TaskPriority.LOW
         )
         
-        db_session.add(task1)
-        db_session.add(task2)
-        await db_session.commit()
-        
         # Filter by status
         response = await client.get(
             "/api/v1/tasks/?status=pending",
@@ -177,26 +261,16 @@ class TestTasks:
         assert data[0]["priority"] == "high"
     
     @pytest.mark.asyncio
-    async def test_get_task_by_id(self, client, auth_headers, db_session, test_user):
+    async def test_get_task_by_id(self, client, auth_headers, project_factory, task_factory):
         """Test getting a specific task by ID."""
         # Create a project and task
-        project = Project(
-            name="Test Project",
-            description="A test project",
-            owner_id=test_user.id
-        )
-        db_session.add(project)
-        await db_session.commit()
-        await db_session.refresh(project)
+        project = await project_factory()
         
-        task = Task(
+        task = await task_factory(
+            project,
             title="Specific Task",
-            description="A specific task",
-            project_id=project.id
+            description="A specific task"
         )
-        db_session.add(task)
-        await db_session.commit()
-        await db_session.refresh(task)
         
         response = await client.get(f"/api/v1/tasks/{task.id}", headers=auth_headers)
         
@@ -215,27 +289,17 @@ class TestTasks:
         assert "Task not found" in response.json()["detail"]
     
     @pytest.mark.asyncio
-    async def test_update_task(self, client, auth_headers, db_session, test_user):
+    async def test_update_task(self, client, auth_headers, project_factory, task_factory):
         """Test updating a task."""
         # Create a project and task
-        project = Project(
-            name="Test Project",
-            description="A test project",
-            owner_id=test_user.id
-        )
-        db_session.add(project)
-        await db_session.commit()
-        await db_session.refresh(project)
+        project = await project_factory()
         
-        task = Task(
+        task = await task_factory(
+            project,
             title="Original Title",
             description="Original description",
-            project_id=project.id,
             status=TaskStatus.PENDING
         )
-        db_session.add(task)
-        await db_session.commit()
-        await db_session.refresh(task)
         
         update_data = {
             "title": "Updated Title",
@@ -270,26 +334,16 @@ class TestTasks:
         assert "Task not found" in response.json()["detail"]
     
     @pytest.mark.asyncio
-    async def test_delete_task(self, client, auth_headers, db_session, test_user):
+    async def test_delete_task(self, client, auth_headers, project_factory, task_factory):
         """Test deleting a task."""
         # Create a project and task
-        project = Project(
-            name="Test Project",
-            description="A test project",
-            owner_id=test_user.id
-        )
-        db_session.add(project)
-        await db_session.commit()
-        await db_session.refresh(project)
+        project = await project_factory()
         
-        task = Task(
+        task = await task_factory(
+            project,
             title="To Delete",
-            description="This task will be deleted",
-            project_id=project.id
+            description="This task will be deleted"
         )
-        db_session.add(task)
-        await db_session.commit()
-        await db_session.refresh(task)
         
         response = await client.delete(f"/api/v1/tasks/{task.id}", headers=auth_headers)
         
@@ -300,33 +354,22 @@ class TestTasks:
         assert response.status_code == 404
     
     @pytest.mark.asyncio
-    async def test_get_project_tasks(self, client, auth_headers, db_session, test_user):
+    async def test_get_project_tasks(self, client, auth_headers, project_factory, task_factory):
         """Test getting tasks for a specific project."""
         # Create a project and tasks
-        project = Project(
-            name="Test Project",
-            description="A test project",
-            owner_id=test_user.id
-        )
-        db_session.add(project)
-        await db_session.commit()
-        await db_session.refresh(project)
+        project = await project_factory()
         
-        task1 = Task(
+        await task_factory(
+            project,
             title="Project Task 1",
-            description="First project task",
-            project_id=project.id
+            description="First project task"
         )
-        task2 = Task(
+        await task_factory(
+            project,
             title="Project Task 2",
-            description="Second project task",
-            project_id=project.id
+            description="Second project task"
         )
         
-        db_session.add(task1)
-        db_session.add(task2)
-        await db_session.commit()
-        
         response = await client.get(
             f"/api/v1/tasks/project/{project.id}/tasks",
             headers=auth_headers
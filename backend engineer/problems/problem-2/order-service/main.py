@@ -3,15 +3,20 @@ Order Service for E-commerce Microservices
 Handles order management, payment processing, and order tracking.
 """
 
-from fastapi import FastAPI, Depends, HTTPException, status, Query
+from fastapi import FastAPI, Depends, HTTPException, status, Query, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, selectinload
 from sqlalchemy import select, func
 from datetime import datetime
+from decimal import Decimal
 from typing import Optional, List
+import asyncio
 import logging
+import time
 import httpx
+import orjson
 
 from shared.schemas import Event, EventType, ServiceHealth, PaginationParams, PaginatedResponse
 from shared.messaging import MessagePublisher, MessageConsumer
@@ -27,7 +32,15 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Create database engine
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.DEBUG,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_use_lifo=True,
+)
 AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 class Base(DeclarativeBase):
@@ -52,6 +65,13 @@ app.add_middleware(
 message_publisher = MessagePublisher(settings.RABBITMQ_URL)
 message_consumer = MessageConsumer(settings.RABBITMQ_URL, "order-service")
 
+# Shared HTTP client for calls to the user and product services, so
+# connections are kept alive and pooled across requests
+http_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(30.0, connect=5.0),
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=40, keepalive_expiry=30)
+)
+
 async def get_db():
     """Get database session."""
     async with AsyncSessionLocal() as session:
@@ -82,6 +102,7 @@ async def shutdown_event():
     """Cleanup on shutdown."""
     await message_publisher.close()
     await message_consumer.close()
+    await http_client.aclose()
     logger.info("Order service stopped")
 
 
@@ -118,9 +139,8 @@ async def handle_product_deleted(event: Event):
 async def validate_user(user_id: int) -> bool:
     """Validate user exists."""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{settings.USER_SERVICE_URL}/users/{user_id}")
-            return response.status_code == 200
+        response = await http_client.get(f"{settings.USER_SERVICE_URL}/users/{user_id}")
+        return response.status_code == 200
     except Exception as e:
         logger.error(f"Failed to validate user {user_id}: {e}")
         return False
@@ -130,109 +150,124 @@ async def validate_products(items: List[OrderItemCreate]) -> tuple[bool, List[di
     """Validate products and get current prices."""
     try:
         product_ids = [item.product_id for item in items]
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{settings.PRODUCT_SERVICE_URL}/products/validate",
-                json={"product_ids": product_ids}
-            )
-            if response.status_code == 200:
-                return True, response.json()
-            return False, []
+        response = await http_client.post(
+            f"{settings.PRODUCT_SERVICE_URL}/products/validate",
+            json={"product_ids": product_ids}
+        )
+        if response.status_code == 200:
+            return True, orjson.loads(response.content)
+        return False, []
     except Exception as e:
         logger.error(f"Failed to validate products: {e}")
         return False, []
 
 
+def build_order_event(event_type: EventType, order: Order) -> Event:
+    """Build an order event from an order with its items loaded."""
+    return Event(
+        event_type=event_type,
+        data={
+            "order_id": order.id,
+            "user_id": order.user_id,
+            "total_amount": float(order.total_amount),
+            "status": order.status,
+            "items": [
+                {
+                    "product_id": item.product_id,
+                    "quantity": item.quantity,
+                    "unit_price": float(item.unit_price),
+                    "total_price": float(item.total_price)
+                }
+                for item in order.items
+            ]
+        },
+        source_service="order-service"
+    )
+
+
+HEALTH_CACHE_TTL = 1.0
+_last_health: tuple[bytes, float] = (b"", float("-inf"))
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return ServiceHealth(
-        service_name="order-service",
-        status="healthy",
-        timestamp=datetime.utcnow(),
-        version="1.0.0"
-    )
+    global _last_health
+    body, built_at = _last_health
+    now = time.monotonic()
+    if now - built_at >= HEALTH_CACHE_TTL:
+        body = ServiceHealth(
+            service_name="order-service",
+            status="healthy",
+            timestamp=datetime.utcnow(),
+            version="1.0.0"
+        ).model_dump_json().encode()
+        _last_health = (body, now)
+    return Response(content=body, media_type="application/json")
 
 
 @app.post("/orders", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_order(
     order_data: OrderCreate,
+    background_tasks: BackgroundTasks,
     user_id: int = None,  # This would come from authentication
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new order."""
-    # Validate user
-    if not await validate_user(user_id):
+    # Validate user and products (with current prices) concurrently
+    user_valid, (is_valid, product_data) = await asyncio.gather(
+        validate_user(user_id),
+        validate_products(order_data.items)
+    )
+    if not user_valid:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid user"
         )
     
-    # Validate products and get current prices
-    is_valid, product_data = await validate_products(order_data.items)
     if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid products"
         )
     
-    # Create product lookup
-    product_lookup = {p["id"]: p for p in product_data}
+    # Only the ids of the validated products are needed to pick the items
+    valid_product_ids = {p["id"] for p in product_data}
+    order_items = [
+        item_data for item_data in order_data.items
+        if item_data.product_id in valid_product_ids
+    ]
     
-    # Calculate total amount
-    total_amount = sum(item.total_price for item in order_data.items)
+    # Calculate total amount from the items that are actually stored; the
+    # schema limits prices to two decimal places, so whole cents add up exactly
+    # as ints and only the final total becomes a Decimal
+    total_cents = sum(int(item_data.total_price * 100) for item_data in order_items)
+    total_amount = Decimal(total_cents).scaleb(-2)
     
-    # Create order
+    # Create order together with its items so both are written in one commit
     db_order = Order(
         user_id=user_id,
         total_amount=total_amount,
         shipping_address=order_data.shipping_address,
-        billing_address=order_data.billing_address
+        billing_address=order_data.billing_address,
+        items=[
+            OrderItem(
+                product_id=item_data.product_id,
+                quantity=item_data.quantity,
+                unit_price=item_data.unit_price,
+                total_price=item_data.total_price
+            )
+            for item_data in order_items
+        ]
     )
     
     db.add(db_order)
     await db.commit()
-    await db.refresh(db_order)
+    await db.refresh(db_order, ["items"])
     
-    # Create order items
-    for item_data in order_data.items:
-        product_info = product_lookup.get(item_data.product_id)
-        if not product_info:
-            continue
-            
-        db_item = OrderItem(
-            order_id=db_order.id,
-            product_id=item_data.product_id,
-            quantity=item_data.quantity,
-            unit_price=item_data.unit_price,
-            total_price=item_data.total_price
-        )
-        db.add(db_item)
-    
-    await db.commit()
-    await db.refresh(db_order)
-    
-    # Publish order created event
-    event = Event(
-        event_type=EventType.ORDER_CREATED,
-        data={
-            "order_id": db_order.id,
-            "user_id": db_order.user_id,
-            "total_amount": float(db_order.total_amount),
-            "status": db_order.status,
-            "items": [
-                {
-                    "product_id": item.product_id,
-                    "quantity": item.quantity,
-                    "unit_price": float(item.unit_price),
-                    "total_price": float(item.total_price)
-                }
-                for item in db_order.items
-            ]
-        },
-        source_service="order-service"
-    )
-    await message_publisher.publish_event(event)
+    # Publish order created event once the response has been sent
+    event = build_order_event(EventType.ORDER_CREATED, db_order)
+    background_tasks.add_task(message_publisher.publish_event, event)
     
     return db_order
 
@@ -241,7 +276,7 @@ async def create_order(
 async def get_order(order_id: int, db: AsyncSession = Depends(get_db)):
     """Get order by ID."""
     result = await db.execute(
-        select(Order).where(Order.id == order_id)
+        select(Order).options(selectinload(Order.items)).where(Order.id == order_id)
     )
     order = result.scalar_one_or_none()
     
@@ -262,21 +297,30 @@ async def get_user_orders(
     db: AsyncSession = Depends(get_db)
 ):
     """Get user orders with pagination."""
-    # Get total count
-    count_query = select(func.count(Order.id)).where(Order.user_id == user_id)
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-    
-    # Get paginated results
+    # Get the page and the total count in one round trip; every row carries
+    # the same windowed total
     offset = (page - 1) * size
     result = await db.execute(
-        select(Order)
+        select(Order, func.count().over().label("total"))
+        .options(selectinload(Order.items))
         .where(Order.user_id == user_id)
         .offset(offset)
         .limit(size)
         .order_by(Order.created_at.desc())
     )
-    orders = result.scalars().all()
+    rows = result.all()
+    orders = [row.Order for row in rows]
+    
+    if rows:
+        total = rows[0].total
+    elif offset:
+        # Past the last page there are no rows to carry the total
+        total_result = await db.execute(
+            select(func.count(Order.id)).where(Order.user_id == user_id)
+        )
+        total = total_result.scalar()
+    else:
+        total = 0
     
     return PaginatedResponse(
         items=[OrderResponse.model_validate(order) for order in orders],
@@ -291,11 +335,12 @@ async def get_user_orders(
 async def update_order_status(
     order_id: int,
     status_update: OrderUpdate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """Update order status."""
     result = await db.execute(
-        select(Order).where(Order.id == order_id)
+        select(Order).options(selectinload(Order.items)).where(Order.id == order_id)
     )
     order = result.scalar_one_or_none()
     
@@ -313,27 +358,9 @@ async def update_order_status(
     await db.commit()
     await db.refresh(order)
     
-    # Publish order updated event
-    event = Event(
-        event_type=EventType.ORDER_UPDATED,
-        data={
-            "order_id": order.id,
-            "user_id": order.user_id,
-            "total_amount": float(order.total_amount),
-            "status": order.status,
-            "items": [
-                {
-                    "product_id": item.product_id,
-                    "quantity": item.quantity,
-                    "unit_price": float(item.unit_price),
-                    "total_price": float(item.total_price)
-                }
-                for item in order.items
-            ]
-        },
-        source_service="order-service"
-    )
-    await message_publisher.publish_event(event)
+    # Publish order updated event once the response has been sent
+    event = build_order_event(EventType.ORDER_UPDATED, order)
+    background_tasks.add_task(message_publisher.publish_event, event)
     
     return order
 
@@ -341,11 +368,12 @@ async def update_order_status(
 @app.post("/orders/{order_id}/cancel", response_model=OrderResponse)
 async def cancel_order(
     order_id: int,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """Cancel an order."""
     result = await db.execute(
-        select(Order).where(Order.id == order_id)
+        select(Order).options(selectinload(Order.items)).where(Order.id == order_id)
     )
     order = result.scalar_one_or_none()
     
@@ -365,31 +393,13 @@ async def cancel_order(
     await db.commit()
     await db.refresh(order)
     
-    # Publish order cancelled event
-    event = Event(
-        event_type=EventType.ORDER_CANCELLED,
-        data={
-            "order_id": order.id,
-            "user_id": order.user_id,
-            "total_amount": float(order.total_amount),
-            "status": order.status,
-            "items": [
-                {
-                    "product_id": item.product_id,
-                    "quantity": item.quantity,
-                    "unit_price": float(item.unit_price),
-                    "total_price": float(item.total_price)
-                }
-                for item in order.items
-            ]
-        },
-        source_service="order-service"
-    )
-    await message_publisher.publish_event(event)
+    # Publish order cancelled event once the response has been sent
+    event = build_order_event(EventType.ORDER_CANCELLED, order)
+    background_tasks.add_task(message_publisher.publish_event, event)
     
     return order
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8003)
+    uvicorn.run(app, host="0.0.0.0", port=8003, loop="uvloop", http="httptools")
@@ -0,0 +1,107 @@
+"""
+Redis-backed response cache and HTTP validators for the product catalog.
+"""
+
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+import redis.asyncio as aioredis
+from fastapi import Request, Response, status
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Catalog reads vastly outnumber writes, so rendered responses are kept in
+# Redis until the TTL passes or a product or category write retires them.
+# Writes bump a generation counter that is part of every key, so a read
+# that raced a write stores its stale body under a generation nobody asks
+# for again instead of overwriting the fresh one.
+CACHE_PREFIX = "product-svc:"
+CACHE_TTL = 300
+GENERATION_KEY = f"{CACHE_PREFIX}generation"
+
+# Browsers and CDNs may reuse a response briefly and revalidate it with
+# its ETag afterwards
+CACHE_CONTROL = "public, max-age=60"
+
+redis_client = aioredis.from_url(settings.REDIS_URL)
+
+
+def build_etag(*parts: Any) -> str:
+    """Build a strong ETag from the values that determine a response body."""
+    fingerprint = "-".join(str(part) for part in parts)
+    digest = hashlib.blake2b(fingerprint.encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header matches the ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+def not_modified(etag: str) -> Response:
+    """Build an empty 304 response carrying the current validators."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+async def response_cache_key(request: Request) -> Optional[str]:
+    """Key a response by cache generation, path and normalized query string."""
+    try:
+        generation = await redis_client.get(GENERATION_KEY)
+    except Exception as e:
+        logger.warning(f"Response cache generation lookup failed: {e}")
+        return None
+    
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return f"{CACHE_PREFIX}{int(generation or 0)}:{request.url.path}?{query}"
+
+
+async def get_cached_response(request: Request, key: Optional[str]) -> Optional[Response]:
+    """Return the cached JSON response for the key, or a 304 if the client's copy is current."""
+    if key is None:
+        return None
+    try:
+        cached = await redis_client.hgetall(key)
+    except Exception as e:
+        logger.warning(f"Response cache lookup failed: {e}")
+        return None
+    if not cached:
+        return None
+    
+    body = cached.pop(b"body")
+    headers = {name.decode(): value.decode() for name, value in cached.items()}
+    etag = headers.get("ETag")
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def cache_response(key: Optional[str], body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+    """Store a JSON response body, plus any headers that belong to it."""
+    if key is None:
+        return
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={"body": body, **(headers or {})})
+            pipe.expire(key, CACHE_TTL)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Response cache store failed: {e}")
+
+
+async def invalidate_response_cache() -> None:
+    """Retire every cached catalog response by moving to a new generation."""
+    try:
+        await redis_client.incr(GENERATION_KEY)
+    except Exception as e:
+        logger.warning(f"Response cache invalidation failed: {e}")
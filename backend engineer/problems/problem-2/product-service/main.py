@@ -3,14 +3,21 @@ Product Service for E-commerce Microservices
 Handles product catalog, inventory management, and search.
 """
 
-from fastapi import FastAPI, Depends, HTTPException, status, Query
+from fastapi import FastAPI, Depends, HTTPException, status, Query, Request, Response, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import select, func, or_
+from sqlalchemy.orm import DeclarativeBase, selectinload
+from sqlalchemy import (
+    select, insert, update, func, or_, exists, bindparam, lambda_stmt, text,
+    table, column, case, cast, literal, BigInteger
+)
+from sqlalchemy.dialects.postgresql import REGCLASS
 from datetime import datetime
 from typing import Optional, List
 import logging
+import orjson
+from pydantic import TypeAdapter
 
 from shared.schemas import Event, EventType, ServiceHealth, PaginatedResponse
 from shared.messaging import MessagePublisher, MessageConsumer
@@ -19,14 +26,26 @@ from schemas.product import (
     ProductCreate, ProductUpdate, ProductResponse,
     CategoryCreate, CategoryResponse
 )
+from core.caching import (
+    CACHE_CONTROL, redis_client, response_cache_key, get_cached_response, cache_response,
+    invalidate_response_cache, build_etag, etag_matches, not_modified
+)
 from core.config import settings
+from core.pagination import encode_cursor, seek_after
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Create database engine
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+engine = create_async_engine(
+    settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
+    echo=settings.DEBUG,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+)
 AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 class Base(DeclarativeBase):
@@ -36,7 +55,8 @@ class Base(DeclarativeBase):
 app = FastAPI(
     title="Product Service",
     description="Product catalog and inventory management service",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -47,17 +67,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Statements on the hot paths are built once and cached with their compiled
+# SQL; only the bound values change per request
+_get_product_stmt = lambda_stmt(
+    lambda: select(Product)
+    .options(selectinload(Product.category))
+    .where(Product.id == bindparam("product_id"), Product.is_active == True)
+)
+_delete_product_stmt = lambda_stmt(
+    lambda: update(Product)
+    .where(Product.id == bindparam("product_id"), Product.is_active == True)
+    .values(is_active=False)
+    .returning(Product.id, Product.name, Product.sku)
+)
+_product_create_checks_stmt = lambda_stmt(
+    lambda: select(
+        exists().where(Category.id == bindparam("category_id")).label("category_exists"),
+        exists().where(Product.sku == bindparam("sku")).label("sku_taken")
+    )
+)
+
+# Planner statistics for the products table, kept current by autovacuum.
+# The table is resolved through regclass, so a same-named table in another
+# schema can never be picked up
+_pg_class = table("pg_class", column("oid"), column("reltuples"))
+_products_row_estimate = (
+    select(cast(_pg_class.c.reltuples, BigInteger))
+    .where(_pg_class.c.oid == cast(literal(Product.__tablename__), REGCLASS))
+    .scalar_subquery()
+)
+
+# Validate and serialize whole result lists in pydantic's core rather than
+# one model at a time
+_product_list_adapter = TypeAdapter(List[ProductResponse])
+_category_list_adapter = TypeAdapter(List[CategoryResponse])
+
 # Message publisher and consumer
 message_publisher = MessagePublisher(settings.RABBITMQ_URL)
 message_consumer = MessageConsumer(settings.RABBITMQ_URL, "product-service")
 
 async def get_db():
     """Get database session."""
+    # The session context manager closes the session on exit
     async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+        yield session
 
 
 @app.on_event("startup")
@@ -78,6 +131,7 @@ async def shutdown_event():
     """Cleanup on shutdown."""
     await message_publisher.close()
     await message_consumer.close()
+    await redis_client.aclose()
     logger.info("Product service stopped")
 
 
@@ -104,10 +158,32 @@ async def health_check():
     )
 
 
+def product_filters(
+    category_id: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None
+) -> list:
+    """Build the WHERE criteria shared by the product listing and search."""
+    filters = [Product.is_active == True]
+    
+    if category_id:
+        filters.append(Product.category_id == category_id)
+    
+    if min_price is not None:
+        filters.append(Product.price >= min_price)
+    
+    if max_price is not None:
+        filters.append(Product.price <= max_price)
+    
+    return filters
+
+
 @app.get("/products", response_model=PaginatedResponse)
 async def get_products(
+    request: Request,
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
     category_id: Optional[int] = None,
     search: Optional[str] = None,
     min_price: Optional[float] = None,
@@ -115,69 +191,148 @@ async def get_products(
     db: AsyncSession = Depends(get_db)
 ):
     """Get products with pagination and filtering."""
-    # Build query
-    query = select(Product).where(Product.is_active == True)
-    
-    if category_id:
-        query = query.where(Product.category_id == category_id)
+    cache_key = await response_cache_key(request)
+    cached = await get_cached_response(request, cache_key)
+    if cached:
+        return cached
     
+    filters = product_filters(category_id, min_price, max_price)
     if search:
         search_term = f"%{search}%"
-        query = query.where(
+        filters.append(
             or_(
                 Product.name.ilike(search_term),
                 Product.description.ilike(search_term)
             )
         )
     
-    if min_price is not None:
-        query = query.where(Product.price >= min_price)
-    
-    if max_price is not None:
-        query = query.where(Product.price <= max_price)
-    
-    # Get total count
-    count_query = select(func.count(Product.id)).where(Product.is_active == True)
-    if category_id:
-        count_query = count_query.where(Product.category_id == category_id)
-    if search:
-        search_term = f"%{search}%"
-        count_query = count_query.where(
-            or_(
-                Product.name.ilike(search_term),
-                Product.description.ilike(search_term)
-            )
+    # The total over all filtered rows rides along with every row of the
+    # page, so both come back in a single round trip
+    total_count = select(func.count()).select_from(Product).where(*filters).scalar_subquery()
+    if len(filters) == 1:
+        # Counting the whole catalog visits every row, so once it is large
+        # the unfiltered listing reports the planner's estimate instead;
+        # Postgres only runs the exact count when the CASE needs it
+        total_count = case(
+            (_products_row_estimate > settings.DB_APPROX_COUNT_THRESHOLD, _products_row_estimate),
+            else_=total_count
         )
-    if min_price is not None:
-        count_query = count_query.where(Product.price >= min_price)
-    if max_price is not None:
-        count_query = count_query.where(Product.price <= max_price)
+    query = (
+        select(Product, total_count.label("total"))
+        .options(selectinload(Product.category))
+        .where(*filters)
+    )
     
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    # A cursor seeks straight to the page through the (created_at, id)
+    # index, while page offsets are kept for older clients
+    if after:
+        query = query.where(seek_after(Product, after))
     
-    # Get paginated results
     offset = (page - 1) * size
-    result = await db.execute(
-        query.offset(offset).limit(size).order_by(Product.created_at.desc())
+    result = await db.stream(
+        query
+        .order_by(Product.created_at.desc(), Product.id.desc())
+        .offset(offset)
+        .limit(size + 1)
+        .execution_options(yield_per=settings.DB_YIELD_PER)
     )
-    products = result.scalars().all()
-    
-    return PaginatedResponse(
-        items=[ProductResponse.model_validate(product) for product in products],
+    rows = [row async for row in result]
+    if rows:
+        total = rows[0].total
+    elif offset or after:
+        # Past the last page there are no rows to carry the total
+        total = await db.scalar(select(total_count))
+    else:
+        total = 0
+    
+    # The extra row only tells whether another page follows
+    products = [row.Product for row in rows]
+    headers = {}
+    if len(products) > size:
+        products = products[:size]
+        headers["X-Next-Cursor"] = encode_cursor(products[-1].created_at, products[-1].id)
+    
+    # The page changes when any product on it is edited, or when products
+    # join or leave the filtered set and shift the page and the total
+    last_updated = max((product.updated_at for product in products), default=None)
+    etag = build_etag(request.url.query, total, last_updated, *(product.id for product in products))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    headers.update({"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    
+    body = PaginatedResponse(
+        items=_product_list_adapter.validate_python(products, from_attributes=True),
         total=total,
         page=page,
         size=size,
         pages=(total + size - 1) // size
+    ).model_dump_json().encode()
+    await cache_response(cache_key, body, headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# Declared before /products/{product_id} so "search" is never parsed as an id
+@app.get("/products/search")
+async def search_products(
+    request: Request,
+    q: str = Query(..., min_length=settings.SEARCH_MIN_LENGTH),
+    category_id: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Search products."""
+    # Padding a short term with whitespace gets past min_length but would
+    # still match almost everything
+    if len(q.strip()) < settings.SEARCH_MIN_LENGTH:
+        return Response(
+            content=orjson.dumps({"query": q, "results": [], "total": 0}),
+            media_type="application/json"
+        )
+    
+    cache_key = await response_cache_key(request)
+    cached = await get_cached_response(request, cache_key)
+    if cached:
+        return cached
+    
+    # Bound the worst case; SET LOCAL ends with the request's transaction
+    await db.execute(text(f"SET LOCAL statement_timeout = {settings.SEARCH_STATEMENT_TIMEOUT_MS}"))
+    
+    # Full-text match against the generated search_vector, which the GIN
+    # index serves, ranked so name hits come before description and sku hits
+    search_query = func.plainto_tsquery("english", q)
+    filters = product_filters(category_id, min_price, max_price)
+    filters.append(Product.search_vector.op("@@")(search_query))
+    
+    result = await db.stream_scalars(
+        select(Product)
+        .options(selectinload(Product.category))
+        .where(*filters)
+        .limit(50)
+        .order_by(func.ts_rank(Product.search_vector, search_query).desc(), Product.name)
+        .execution_options(yield_per=settings.DB_YIELD_PER)
     )
+    products = [product async for product in result]
+    
+    results = _product_list_adapter.validate_python(products, from_attributes=True)
+    body = orjson.dumps({
+        "query": q,
+        "results": _product_list_adapter.dump_python(results, mode="json"),
+        "total": len(results)
+    })
+    await cache_response(cache_key, body)
+    return Response(content=body, media_type="application/json")
 
 
 @app.get("/products/{product_id}", response_model=ProductResponse)
-async def get_product(product_id: int, db: AsyncSession = Depends(get_db)):
+async def get_product(product_id: int, request: Request, db: AsyncSession = Depends(get_db)):
     """Get product by ID."""
-    result = await db.execute(
-        select(Product).where(Product.id == product_id, Product.is_active == True)
-    )
+    cache_key = await response_cache_key(request)
+    cached = await get_cached_response(request, cache_key)
+    if cached:
+        return cached
+    
+    result = await db.execute(_get_product_stmt, {"product_id": product_id})
     product = result.scalar_one_or_none()
     
     if not product:
@@ -186,54 +341,55 @@ async def get_product(product_id: int, db: AsyncSession = Depends(get_db)):
             detail="Product not found"
         )
     
-    return product
+    etag = build_etag(product.id, product.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    
+    body = ProductResponse.model_validate(product).model_dump_json().encode()
+    await cache_response(cache_key, body, headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.post("/products", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
 async def create_product(
     product_data: ProductCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new product (admin only)."""
-    # Verify category exists
+    # Verify the category exists and the SKU is free in one round trip
     result = await db.execute(
-        select(Category).where(Category.id == product_data.category_id)
+        _product_create_checks_stmt,
+        {"category_id": product_data.category_id, "sku": product_data.sku}
     )
-    category = result.scalar_one_or_none()
+    checks = result.one()
     
-    if not category:
+    if not checks.category_exists:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Category not found"
         )
     
-    # Check if SKU already exists
-    result = await db.execute(
-        select(Product).where(Product.sku == product_data.sku)
-    )
-    existing_product = result.scalar_one_or_none()
-    
-    if existing_product:
+    if checks.sku_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="SKU already exists"
         )
     
-    # Create product
-    db_product = Product(
-        name=product_data.name,
-        description=product_data.description,
-        price=product_data.price,
-        category_id=product_data.category_id,
-        stock_quantity=product_data.stock_quantity,
-        sku=product_data.sku
+    # Create product; RETURNING hands back the stored row, server defaults
+    # included, so it doesn't have to be re-read after the commit
+    result = await db.execute(
+        insert(Product)
+        .values(**product_data.model_dump())
+        .returning(Product)
+        .options(selectinload(Product.category))
     )
-    
-    db.add(db_product)
+    db_product = result.scalar_one()
     await db.commit()
-    await db.refresh(db_product)
+    await invalidate_response_cache()
     
-    # Publish product created event
+    # Publish product created event once the response has been sent
     event = Event(
         event_type=EventType.PRODUCT_CREATED,
         data={
@@ -246,7 +402,7 @@ async def create_product(
         },
         source_service="product-service"
     )
-    await message_publisher.publish_event(event)
+    background_tasks.add_task(message_publisher.publish_event, event)
     
     return db_product
 
@@ -255,12 +411,18 @@ async def create_product(
 async def update_product(
     product_id: int,
     product_update: ProductUpdate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """Update a product (admin only)."""
-    result = await db.execute(
-        select(Product).where(Product.id == product_id)
-    )
+    update_data = product_update.model_dump(exclude_unset=True)
+    
+    # Apply the changes and read back the updated row in one statement
+    if update_data:
+        query = update(Product).where(Product.id == product_id).values(**update_data).returning(Product)
+    else:
+        query = select(Product).where(Product.id == product_id)
+    result = await db.execute(query.options(selectinload(Product.category)))
     product = result.scalar_one_or_none()
     
     if not product:
@@ -269,15 +431,10 @@ async def update_product(
             detail="Product not found"
         )
     
-    # Update product fields
-    update_data = product_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(product, field, value)
-    
     await db.commit()
-    await db.refresh(product)
+    await invalidate_response_cache()
     
-    # Publish product updated event
+    # Publish product updated event once the response has been sent
     event = Event(
         event_type=EventType.PRODUCT_UPDATED,
         data={
@@ -290,18 +447,22 @@ async def update_product(
         },
         source_service="product-service"
     )
-    await message_publisher.publish_event(event)
+    background_tasks.add_task(message_publisher.publish_event, event)
     
     return product
 
 
 @app.delete("/products/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_product(product_id: int, db: AsyncSession = Depends(get_db)):
+async def delete_product(
+    product_id: int,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
+):
     """Delete a product (admin only)."""
-    result = await db.execute(
-        select(Product).where(Product.id == product_id)
-    )
-    product = result.scalar_one_or_none()
+    # Soft delete by setting is_active to False, reading back what the event
+    # needs in the same statement
+    result = await db.execute(_delete_product_stmt, {"product_id": product_id})
+    product = result.one_or_none()
     
     if not product:
         raise HTTPException(
@@ -309,11 +470,10 @@ async def delete_product(product_id: int, db: AsyncSession = Depends(get_db)):
             detail="Product not found"
         )
     
-    # Soft delete by setting is_active to False
-    product.is_active = False
     await db.commit()
+    await invalidate_response_cache()
     
-    # Publish product deleted event
+    # Publish product deleted event once the response has been sent
     event = Event(
         event_type=EventType.PRODUCT_DELETED,
         data={
@@ -323,58 +483,29 @@ async def delete_product(product_id: int, db: AsyncSession = Depends(get_db)):
         },
         source_service="product-service"
     )
-    await message_publisher.publish_event(event)
+    background_tasks.add_task(message_publisher.publish_event, event)
     
     return None
 
 
-@app.get("/products/search")
-async def search_products(
-    q: str = Query(..., min_length=1),
-    category_id: Optional[int] = None,
-    min_price: Optional[float] = None,
-    max_price: Optional[float] = None,
-    db: AsyncSession = Depends(get_db)
-):
-    """Search products."""
-    # This is similar to get_products but with different response format
-    query = select(Product).where(Product.is_active == True)
-    
-    search_term = f"%{q}%"
-    query = query.where(
-        or_(
-            Product.name.ilike(search_term),
-            Product.description.ilike(search_term),
-            Product.sku.ilike(search_term)
-        )
-    )
-    
-    if category_id:
-        query = query.where(Product.category_id == category_id)
-    
-    if min_price is not None:
-        query = query.where(Product.price >= min_price)
-    
-    if max_price is not None:
-        query = query.where(Product.price <= max_price)
-    
-    result = await db.execute(query.limit(50).order_by(Product.name))
-    products = result.scalars().all()
-    
-    return {
-        "query": q,
-        "results": [ProductResponse.model_validate(product) for product in products],
-        "total": len(products)
-    }
-
-
 @app.get("/categories", response_model=List[CategoryResponse])
-async def get_categories(db: AsyncSession = Depends(get_db)):
+async def get_categories(request: Request, db: AsyncSession = Depends(get_db)):
     """Get all product categories."""
-    result = await db.execute(select(Category).order_by(Category.name))
-    categories = result.scalars().all()
+    cache_key = await response_cache_key(request)
+    cached = await get_cached_response(request, cache_key)
+    if cached:
+        return cached
     
-    return categories
+    result = await db.stream_scalars(
+        select(Category).order_by(Category.name).execution_options(yield_per=settings.DB_YIELD_PER)
+    )
+    categories = [category async for category in result]
+    
+    body = _category_list_adapter.dump_json(
+        _category_list_adapter.validate_python(categories, from_attributes=True)
+    )
+    await cache_response(cache_key, body)
+    return Response(content=body, media_type="application/json")
 
 
 @app.post("/categories", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
@@ -403,11 +534,12 @@ async def create_category(
     db.add(db_category)
     await db.commit()
     await db.refresh(db_category)
+    await invalidate_response_cache()
     
     return db_category
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8002)
+    uvicorn.run(app, host="0.0.0.0", port=8002, loop="uvloop", http="httptools")
 
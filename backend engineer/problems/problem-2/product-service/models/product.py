@@ -2,10 +2,19 @@
 Product and Category models for the Product Service.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Numeric, ForeignKey, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
+
+# Weighted document searched by /products/search: name ranks above
+# description, which ranks above sku
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(sku, '')), 'C')"
+)
 
 Base = declarative_base()
 
@@ -42,9 +51,28 @@ class Product(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Maintained by Postgres and only used in WHERE/ORDER BY, so never loaded
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
     
     # Relationship
     category = relationship("Category", back_populates="products")
     
+    __table_args__ = (
+        # Serves the newest-first listing and its keyset cursor
+        Index("ix_products_created_id", created_at.desc(), id.desc()),
+        Index(
+            "ix_products_active_cat_created",
+            category_id, created_at.desc(), id.desc(),
+            postgresql_where=is_active == True
+        ),
+        # Trigram indexes let ILIKE '%term%' searches use an index (pg_trgm)
+        Index("ix_products_name_trgm", name, postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index(
+            "ix_products_description_trgm", description,
+            postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}
+        ),
+        Index("ix_products_search_vector", search_vector, postgresql_using="gin"),
+    )
+    
     def __repr__(self) -> str:
         return f"<Product(id={self.id}, name='{self.name}', sku='{self.sku}')>"
@@ -3,17 +3,18 @@ Message queue utilities for inter-service communication.
 """
 
 import json
-import asyncio
 from typing import Any, Dict, Callable, Optional, List
-from pika import ConnectionParameters
-from pika.adapters.asyncio_connection import AsyncioConnection
-from pika.exchange_type import ExchangeType
+import aio_pika
+from aio_pika import DeliveryMode, ExchangeType, Message
+from aio_pika.abc import AbstractIncomingMessage
 import logging
 
 from .schemas import Event, EventType
 
 logger = logging.getLogger(__name__)
 
+EXCHANGE_NAME = 'ecommerce_events'
+
 
 class MessagePublisher:
     """Message publisher for sending events."""
@@ -22,17 +23,18 @@ class MessagePublisher:
         self.rabbitmq_url = rabbitmq_url
         self.connection = None
         self.channel = None
+        self.exchange = None
     
     async def connect(self):
         """Connect to RabbitMQ."""
         try:
-            self.connection = AsyncioConnection(
-                ConnectionParameters.from_url(self.rabbitmq_url)
-            )
-            self.channel = self.connection.channel()
-            self.channel.exchange_declare(
-                exchange='ecommerce_events',
-                exchange_type=ExchangeType.topic
+            # A robust connection re-establishes itself and its channels
+            # after a broker restart
+            self.connection = await aio_pika.connect_robust(self.rabbitmq_url)
+            self.channel = await self.connection.channel()
+            self.exchange = await self.channel.declare_exchange(
+                EXCHANGE_NAME,
+                ExchangeType.TOPIC
             )
             logger.info("Connected to RabbitMQ")
         except Exception as e:
@@ -41,21 +43,21 @@ class MessagePublisher:
     
     async def publish_event(self, event: Event, routing_key: Optional[str] = None):
         """Publish an event to the message queue."""
-        if not self.channel:
+        if not self.exchange:
             await self.connect()
         
         try:
-            message = json.dumps(event.model_dump(), default=str)
+            # Serialized by pydantic's compiled core in a single pass
+            message = event.model_dump_json().encode()
             routing_key = routing_key or event.event_type.value
             
-            self.channel.basic_publish(
-                exchange='ecommerce_events',
-                routing_key=routing_key,
-                body=message,
-                properties={
-                    'content_type': 'application/json',
-                    'delivery_mode': 2,  # Make message persistent
-                }
+            await self.exchange.publish(
+                Message(
+                    message,
+                    content_type='application/json',
+                    delivery_mode=DeliveryMode.PERSISTENT
+                ),
+                routing_key=routing_key
             )
             logger.info(f"Published event: {event.event_type.value}")
         except Exception as e:
@@ -65,7 +67,7 @@ class MessagePublisher:
     async def close(self):
         """Close the connection."""
         if self.connection and not self.connection.is_closed:
-            self.connection.close()
+            await self.connection.close()
 
 
 class MessageConsumer:
@@ -76,18 +78,17 @@ class MessageConsumer:
         self.service_name = service_name
         self.connection = None
         self.channel = None
+        self.exchange = None
         self.handlers: Dict[EventType, Callable] = {}
     
     async def connect(self):
         """Connect to RabbitMQ."""
         try:
-            self.connection = AsyncioConnection(
-                ConnectionParameters.from_url(self.rabbitmq_url)
-            )
-            self.channel = self.connection.channel()
-            self.channel.exchange_declare(
-                exchange='ecommerce_events',
-                exchange_type=ExchangeType.topic
+            self.connection = await aio_pika.connect_robust(self.rabbitmq_url)
+            self.channel = await self.connection.channel()
+            self.exchange = await self.channel.declare_exchange(
+                EXCHANGE_NAME,
+                ExchangeType.TOPIC
             )
             logger.info(f"Connected to RabbitMQ for {self.service_name}")
         except Exception as e:
@@ -106,47 +107,35 @@ class MessageConsumer:
         
         # Create queue
         queue_name = f"{self.service_name}_queue"
-        self.channel.queue_declare(queue=queue_name, durable=True)
+        queue = await self.channel.declare_queue(queue_name, durable=True)
         
         # Bind queue to exchange with patterns
         for pattern in queue_patterns:
-            self.channel.queue_bind(
-                exchange='ecommerce_events',
-                queue=queue_name,
-                routing_key=pattern
-            )
+            await queue.bind(self.exchange, routing_key=pattern)
         
-        # Set up consumer
-        self.channel.basic_consume(
-            queue=queue_name,
-            on_message_callback=self._handle_message,
-            auto_ack=False
-        )
+        # Deliveries are dispatched to _handle_message on the event loop;
+        # this returns once the consumer is registered
+        await queue.consume(self._handle_message)
         
         logger.info(f"Started consuming messages for {self.service_name}")
-        self.channel.start_consuming()
     
-    def _handle_message(self, channel, method, properties, body):
+    async def _handle_message(self, message: AbstractIncomingMessage):
         """Handle incoming message."""
         try:
-            message = json.loads(body.decode('utf-8'))
-            event = Event(**message)
+            event = Event(**json.loads(message.body))
             
             if event.event_type in self.handlers:
-                # Run the handler in the event loop
-                loop = asyncio.get_event_loop()
-                loop.create_task(self.handlers[event.event_type](event))
-                channel.basic_ack(delivery_tag=method.delivery_tag)
+                await self.handlers[event.event_type](event)
+                await message.ack()
                 logger.info(f"Processed event: {event.event_type.value}")
             else:
                 logger.warning(f"No handler for event: {event.event_type.value}")
-                channel.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+                await message.nack(requeue=False)
         except Exception as e:
             logger.error(f"Failed to process message: {e}")
-            channel.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            await message.nack(requeue=False)
     
     async def close(self):
         """Close the connection."""
         if self.connection and not self.connection.is_closed:
-            self.connection.close()
-
+            await self.connection.close()
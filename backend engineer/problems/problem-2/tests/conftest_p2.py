@@ -3,9 +3,11 @@ Pytest configuration and fixtures for microservices testing.
 """
 
 import pytest
+import pytest_asyncio
 import asyncio
 import httpx
-from typing import AsyncGenerator
+import orjson
+from typing import Any, AsyncGenerator
 import json
 
 
@@ -17,35 +19,107 @@ def event_loop():
     loop.close()
 
 
-@pytest.fixture
+# Clients live for the whole session so every test reuses warm keep-alive
+# connections instead of opening new ones
+CLIENT_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=90)
+# Fail fast on a dead service instead of stalling a whole concurrent batch
+CLIENT_TIMEOUT = httpx.Timeout(connect=1.0, read=3.0, write=3.0, pool=5.0)
+# Local rate-limit probes should answer in well under a second
+PROBE_TIMEOUT = 1.0
+
+
+@pytest_asyncio.fixture(scope="session")
 async def api_gateway_client() -> AsyncGenerator[httpx.AsyncClient, None]:
-    """Create API Gateway client for testing."""
-    async with httpx.AsyncClient(base_url="http://localhost:8000") as client:
+    """Create API Gateway client shared by the test session."""
+    async with httpx.AsyncClient(
+        base_url="http://localhost:8000", limits=CLIENT_LIMITS, timeout=CLIENT_TIMEOUT
+    ) as client:
         yield client
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(scope="session")
 async def user_service_client() -> AsyncGenerator[httpx.AsyncClient, None]:
-    """Create User Service client for testing."""
-    async with httpx.AsyncClient(base_url="http://localhost:8001") as client:
+    """Create User Service client shared by the test session."""
+    async with httpx.AsyncClient(
+        base_url="http://localhost:8001", limits=CLIENT_LIMITS, timeout=CLIENT_TIMEOUT
+    ) as client:
         yield client
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(scope="session")
 async def product_service_client() -> AsyncGenerator[httpx.AsyncClient, None]:
-    """Create Product Service client for testing."""
-    async with httpx.AsyncClient(base_url="http://localhost:8002") as client:
+    """Create Product Service client shared by the test session."""
+    async with httpx.AsyncClient(
+        base_url="http://localhost:8002", limits=CLIENT_LIMITS, timeout=CLIENT_TIMEOUT
+    ) as client:
         yield client
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(scope="session")
 async def order_service_client() -> AsyncGenerator[httpx.AsyncClient, None]:
-    """Create Order Service client for testing."""
-    async with httpx.AsyncClient(base_url="http://localhost:8003") as client:
+    """Create Order Service client shared by the test session."""
+    async with httpx.AsyncClient(
+        base_url="http://localhost:8003", limits=CLIENT_LIMITS, timeout=CLIENT_TIMEOUT
+    ) as client:
         yield client
 
 
-@pytest.fixture
+def fast_json(response: httpx.Response) -> Any:
+    """Decode a response body with orjson rather than the stdlib json module."""
+    return orjson.loads(response.content)
+
+
+@pytest_asyncio.fixture(scope="session")
+async def registered_user(user_service_client: httpx.AsyncClient, sample_user_data) -> dict:
+    """Register and log in the sample user once for the whole session."""
+    # Registration is rejected if the user already exists, which is fine here
+    await user_service_client.post("/auth/register", json=sample_user_data)
+    
+    login_data = {
+        "username": sample_user_data["username"],
+        "password": sample_user_data["password"]
+    }
+    login_response = await user_service_client.post("/auth/login", json=login_data)
+    assert login_response.status_code == 200
+    token = login_response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    profile_response = await user_service_client.get("/auth/me", headers=headers)
+    return {"user": profile_response.json(), "token": token, "headers": headers}
+
+
+async def probe_rate_limit(
+    client: httpx.AsyncClient, url: str = "/", attempts: int = 150, concurrency: int = 50
+) -> bool:
+    """Send a bounded concurrent burst and report whether any request got a 429.
+    
+    Returns as soon as the first 429 arrives and cancels the requests still in flight.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    # A body-less GET can be sent repeatedly, so the URL is parsed only once
+    request = client.build_request("GET", url, timeout=PROBE_TIMEOUT)
+    
+    async def limited_get() -> httpx.Response:
+        async with semaphore:
+            return await client.send(request)
+    
+    tasks = [asyncio.create_task(limited_get()) for _ in range(attempts)]
+    try:
+        for next_response in asyncio.as_completed(tasks):
+            try:
+                response = await next_response
+            except httpx.HTTPError:
+                continue
+            if response.status_code == 429:
+                return True
+        return False
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.fixture(scope="session")
 def sample_user_data():
     """Sample user data for testing."""
     return {
@@ -59,7 +133,7 @@ def sample_user_data():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_product_data():
     """Sample product data for testing."""
     return {
@@ -72,7 +146,7 @@ def sample_product_data():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_order_data():
     """Sample order data for testing."""
     return {
@@ -2,9 +2,10 @@
 Tests for API Gateway service.
 """
 
+import asyncio
 import pytest
 import httpx
-from tests.conftest import api_gateway_client
+from tests.conftest import api_gateway_client, probe_rate_limit, fast_json
 
 
 class TestAPIGateway:
@@ -15,7 +16,7 @@ class TestAPIGateway:
         response = await api_gateway_client.get("/health")
         assert response.status_code == 200
         
-        data = response.json()
+        data = fast_json(response)
         assert "status" in data
         assert "services" in data
         assert "timestamp" in data
@@ -32,15 +33,9 @@ class TestAPIGateway:
     
     async def test_rate_limiting(self, api_gateway_client: httpx.AsyncClient):
         """Test rate limiting functionality."""
-        # Make multiple requests to trigger rate limiting
-        responses = []
-        for _ in range(105):  # Exceed default rate limit of 100
-            response = await api_gateway_client.get("/")
-            responses.append(response)
-        
-        # Check if rate limiting is working
-        rate_limited_responses = [r for r in responses if r.status_code == 429]
-        assert len(rate_limited_responses) > 0
+        # Burst past the default rate limit of 100 until a request is rejected,
+        # giving up rather than hanging if the gateway stops answering
+        assert await asyncio.wait_for(probe_rate_limit(api_gateway_client), timeout=5)
     
     async def test_cors_headers(self, api_gateway_client: httpx.AsyncClient):
         """Test CORS headers are present."""
@@ -2,25 +2,24 @@
 Integration tests for the complete microservices system.
 """
 
+import asyncio
 import pytest
 import httpx
 from tests.conftest import (
     api_gateway_client, user_service_client, product_service_client, 
-    order_service_client, sample_user_data, sample_product_data, sample_order_data
+    order_service_client, sample_user_data, sample_product_data, sample_order_data,
+    registered_user, probe_rate_limit, fast_json
 )
 
 
 class TestIntegration:
     """Integration test cases for the complete system."""
     
-    async def test_complete_user_journey(self, api_gateway_client: httpx.AsyncClient, sample_user_data):
+    async def test_complete_user_journey(
+        self, api_gateway_client: httpx.AsyncClient, registered_user, sample_user_data
+    ):
         """Test complete user journey through API Gateway."""
-        # Register user through API Gateway
-        response = await api_gateway_client.post("/auth/register", json=sample_user_data)
-        assert response.status_code == 201
-        
-        user_data = response.json()
-        user_id = user_data["id"]
+        user_id = registered_user["user"]["id"]
         
         # Login through API Gateway
         login_data = {
@@ -80,7 +79,7 @@ class TestIntegration:
         response = await api_gateway_client.get("/health")
         assert response.status_code == 200
         
-        data = response.json()
+        data = fast_json(response)
         assert "status" in data
         assert "services" in data
         assert "timestamp" in data
@@ -107,15 +106,9 @@ class TestIntegration:
     
     async def test_rate_limiting_through_gateway(self, api_gateway_client: httpx.AsyncClient):
         """Test rate limiting through API Gateway."""
-        # Make multiple requests to trigger rate limiting
-        responses = []
-        for _ in range(105):  # Exceed default rate limit of 100
-            response = await api_gateway_client.get("/")
-            responses.append(response)
-        
-        # Check if rate limiting is working
-        rate_limited_responses = [r for r in responses if r.status_code == 429]
-        assert len(rate_limited_responses) > 0
+        # Burst past the default rate limit of 100 until a request is rejected,
+        # giving up rather than hanging if the gateway stops answering
+        assert await asyncio.wait_for(probe_rate_limit(api_gateway_client), timeout=5)
     
     async def test_cors_through_gateway(self, api_gateway_client: httpx.AsyncClient):
         """Test CORS headers through API Gateway."""
@@ -4,7 +4,7 @@ Tests for Order Service.
 
 import pytest
 import httpx
-from tests.conftest import order_service_client, sample_order_data
+from tests.conftest import order_service_client, sample_order_data, fast_json
 
 
 class TestOrderService:
@@ -15,7 +15,7 @@ class TestOrderService:
         response = await order_service_client.get("/health")
         assert response.status_code == 200
         
-        data = response.json()
+        data = fast_json(response)
         assert data["service_name"] == "order-service"
         assert data["status"] == "healthy"
     
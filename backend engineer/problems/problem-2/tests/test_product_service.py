@@ -2,9 +2,10 @@
 Tests for Product Service.
 """
 
+import uuid
 import pytest
 import httpx
-from tests.conftest import product_service_client, sample_product_data
+from tests.conftest import product_service_client, sample_product_data, fast_json
 
 
 class TestProductService:
@@ -15,7 +16,7 @@ class TestProductService:
         response = await product_service_client.get("/health")
         assert response.status_code == 200
         
-        data = response.json()
+        data = fast_json(response)
         assert data["service_name"] == "product-service"
         assert data["status"] == "healthy"
     
@@ -92,6 +93,62 @@ class TestProductService:
         assert data["query"] == "laptop"
         assert isinstance(data["results"], list)
     
+    async def test_search_products_short_query(self, product_service_client: httpx.AsyncClient):
+        """Test that search terms under three characters are rejected or answered empty."""
+        response = await product_service_client.get("/products/search", params={"q": "ab"})
+        assert response.status_code == 422
+        
+        # Whitespace padding gets past min_length but still searches nothing
+        response = await product_service_client.get("/products/search", params={"q": " ab "})
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data == {"query": " ab ", "results": [], "total": 0}
+    
+    async def test_search_products_matches_word_forms(self, product_service_client: httpx.AsyncClient):
+        """Test that full-text search matches stemmed word forms."""
+        # A substring match for "laptops" finds nothing; the English stemmer
+        # reduces it to the same lexeme as the seeded "Laptop Pro 15\""
+        response = await product_service_client.get("/products/search?q=laptops")
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert "LAPTOP-PRO-15" in [product["sku"] for product in data["results"]]
+    
+    async def test_search_products_ranks_name_matches_first(self, product_service_client: httpx.AsyncClient):
+        """Test that a name match outranks a description-only match."""
+        term = f"zq{uuid.uuid4().hex[:8]}"
+        sku_suffix = uuid.uuid4().hex[:8].upper()
+        description_match = {
+            "name": "Desk Lamp",
+            "description": f"Pairs well with the {term} shade",
+            "price": 19.99,
+            "category_id": 1,
+            "sku": f"SEARCH-DESC-{sku_suffix}"
+        }
+        name_match = {
+            "name": f"{term} Shade",
+            "description": "Replacement lamp shade",
+            "price": 9.99,
+            "category_id": 1,
+            "sku": f"SEARCH-NAME-{sku_suffix}"
+        }
+        created = []
+        for product_data in (description_match, name_match):
+            response = await product_service_client.post("/products", json=product_data)
+            assert response.status_code == 201
+            created.append(response.json()["id"])
+        
+        try:
+            response = await product_service_client.get(f"/products/search?q={term}")
+            assert response.status_code == 200
+            
+            data = response.json()
+            assert [product["sku"] for product in data["results"]] == [name_match["sku"], description_match["sku"]]
+        finally:
+            for product_id in created:
+                await product_service_client.delete(f"/products/{product_id}")
+    
     async def test_get_categories(self, product_service_client: httpx.AsyncClient):
         """Test getting product categories."""
         response = await product_service_client.get("/categories")
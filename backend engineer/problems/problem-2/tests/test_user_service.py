@@ -4,7 +4,7 @@ Tests for User Service.
 
 import pytest
 import httpx
-from tests.conftest import user_service_client, sample_user_data
+from tests.conftest import user_service_client, sample_user_data, registered_user, fast_json
 
 
 class TestUserService:
@@ -15,7 +15,7 @@ class TestUserService:
         response = await user_service_client.get("/health")
         assert response.status_code == 200
         
-        data = response.json()
+        data = fast_json(response)
         assert data["service_name"] == "user-service"
         assert data["status"] == "healthy"
     
@@ -45,12 +45,8 @@ class TestUserService:
         data = response.json()
         assert "Email already registered" in data["detail"]
     
-    async def test_user_login(self, user_service_client: httpx.AsyncClient, sample_user_data):
+    async def test_user_login(self, user_service_client: httpx.AsyncClient, sample_user_data, registered_user):
         """Test user login."""
-        # Register user first
-        await user_service_client.post("/auth/register", json=sample_user_data)
-        
-        # Login
         login_data = {
             "username": sample_user_data["username"],
             "password": sample_user_data["password"]
@@ -74,34 +70,19 @@ class TestUserService:
         data = response.json()
         assert "Incorrect username or password" in data["detail"]
     
-    async def test_get_user_profile(self, user_service_client: httpx.AsyncClient, sample_user_data):
+    async def test_get_user_profile(self, user_service_client: httpx.AsyncClient, sample_user_data, registered_user):
         """Test getting user profile."""
-        # Register and login user
-        await user_service_client.post("/auth/register", json=sample_user_data)
-        
-        login_data = {
-            "username": sample_user_data["username"],
-            "password": sample_user_data["password"]
-        }
-        login_response = await user_service_client.post("/auth/login", json=login_data)
-        token = login_response.json()["access_token"]
-        
-        # Get user profile
-        headers = {"Authorization": f"Bearer {token}"}
-        response = await user_service_client.get("/auth/me", headers=headers)
+        response = await user_service_client.get("/auth/me", headers=registered_user["headers"])
         assert response.status_code == 200
         
         data = response.json()
         assert data["email"] == sample_user_data["email"]
         assert data["username"] == sample_user_data["username"]
     
-    async def test_get_user_by_id(self, user_service_client: httpx.AsyncClient, sample_user_data):
+    async def test_get_user_by_id(self, user_service_client: httpx.AsyncClient, sample_user_data, registered_user):
         """Test getting user by ID."""
-        # Register user
-        register_response = await user_service_client.post("/auth/register", json=sample_user_data)
-        user_id = register_response.json()["id"]
+        user_id = registered_user["user"]["id"]
         
-        # Get user by ID
         response = await user_service_client.get(f"/users/{user_id}")
         assert response.status_code == 200
         
@@ -109,26 +90,18 @@ class TestUserService:
         assert data["id"] == user_id
         assert data["email"] == sample_user_data["email"]
     
-    async def test_update_user_profile(self, user_service_client: httpx.AsyncClient, sample_user_data):
+    async def test_update_user_profile(self, user_service_client: httpx.AsyncClient, registered_user):
         """Test updating user profile."""
-        # Register and login user
-        await user_service_client.post("/auth/register", json=sample_user_data)
-        
-        login_data = {
-            "username": sample_user_data["username"],
-            "password": sample_user_data["password"]
-        }
-        login_response = await user_service_client.post("/auth/login", json=login_data)
-        token = login_response.json()["access_token"]
-        user_id = login_response.json()["id"]
+        user_id = registered_user["user"]["id"]
         
         # Update user profile
         update_data = {
             "first_name": "Updated",
             "last_name": "Name"
         }
-        headers = {"Authorization": f"Bearer {token}"}
-        response = await user_service_client.put(f"/users/{user_id}", json=update_data, headers=headers)
+        response = await user_service_client.put(
+            f"/users/{user_id}", json=update_data, headers=registered_user["headers"]
+        )
         assert response.status_code == 200
         
         data = response.json()